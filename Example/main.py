@@ -1,4 +1,5 @@
 import asyncio
+import signal
 
 import hyperate
 
@@ -27,14 +28,32 @@ async def main():
 
     await hr.join_heartbeat_channel("internal-testing")
 
+    # Park the event loop until a shutdown signal arrives instead of waking
+    # it up periodically
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows event loops don't support signal handlers; Ctrl+C
+            # raises KeyboardInterrupt out of asyncio.run() instead
+            pass
+
     try:
-        while True:
-            await asyncio.sleep(1)
-    except (KeyboardInterrupt, Exception):
+        await stop.wait()
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
         print("Exiting...")
-
-    await hr.disconnect()
+        await hr.disconnect()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Prefer the libuv-based event loop where it is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
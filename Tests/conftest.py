@@ -6,33 +6,70 @@ used across all test modules.
 """
 
 import asyncio
+import functools
+import importlib.util
+import itertools
+import json
 import logging
 import os
+import random
+import subprocess
+import sys
 import tempfile
 import unittest
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Union
 from unittest.mock import AsyncMock, Mock, patch
+from xml.etree import ElementTree
 
 import pytest
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in the test requirements
+    orjson = None
+
 # Configure test logging
 logging.basicConfig(
     level=logging.WARNING,  # Reduce noise during tests
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
+if orjson is not None:
+
+    def _dumps(obj):
+        """Serialize obj to a JSON string with orjson."""
+        return orjson.dumps(obj).decode()
+
+    _dumpb = orjson.dumps
+
+else:
+    _dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+    def _dumpb(obj):
+        """Serialize obj to UTF-8 JSON bytes with the stdlib encoder."""
+        return _dumps(obj).encode()
+
+
 # Global variable to store the API token from command line
 _api_token = None
 
+# Prefixes of environment variable references that were never expanded
+_UNEXPANDED_TOKEN_PREFIXES = ("${",)
+
 
-def get_api_token():
+def get_api_token() -> Optional[str]:
     """Get the API token from command line argument or environment variable."""
-    global _api_token
     # First check if we have a token from command line
-    if _api_token and _api_token.strip() and not _api_token.startswith("${"):
+    if (
+        _api_token
+        and _api_token.strip()
+        and not _api_token.startswith(_UNEXPANDED_TOKEN_PREFIXES)
+    ):
         return _api_token
 
-    # Check environment variable
+    # Check environment variable; read on every call so in-process changes
+    # (e.g. run_real_integration exporting the token) are picked up
     env_token = os.environ.get("HYPERATE_API_TOKEN")
     if env_token and env_token.strip():
         return env_token
@@ -56,8 +93,21 @@ def pytest_addoption(parser):
     )
 
 
+# Test category markers, used to select categories within a single session
+TEST_MARKERS = {
+    "unit": "Unit tests",
+    "integration": "Integration tests with mocked components",
+    "real_integration": "Integration tests against the real HypeRate API",
+    "performance": "Performance tests",
+    "slow": "Slow running tests",
+}
+
+
 def pytest_configure(config):
-    """Configure pytest with the token argument."""
+    """Configure pytest with the token argument and test category markers."""
+    for marker, description in TEST_MARKERS.items():
+        config.addinivalue_line("markers", f"{marker}: {description}")
+
     token = config.getoption("--token")
     if token:
         set_api_token(token)
@@ -97,16 +147,23 @@ TEST_CONFIG = {
 }
 
 
+@functools.lru_cache(maxsize=None)
+def _single_field_message(topic: str, field: str, value: Any) -> bytes:
+    """Serialize a message whose payload holds one field, reusing past results."""
+    return _dumpb({"topic": topic, "payload": {field: value}})
+
+
 class MockWebSocket:
     """Mock WebSocket for testing."""
 
+    __slots__ = ("sent_messages", "closed", "_messages_to_receive")
+
     def __init__(self):
-        self.sent_messages: List[str] = []
+        self.sent_messages: List[Union[str, bytes]] = []
         self.closed = False
-        self._messages_to_receive: List[str] = []
-        self._receive_index = 0
+        self._messages_to_receive: Deque[Union[str, bytes]] = deque()
 
-    async def send(self, message: str) -> None:
+    async def send(self, message: Union[str, bytes]) -> None:
         """Mock send method."""
         if self.closed:
             raise Exception("WebSocket is closed")
@@ -116,7 +173,7 @@ class MockWebSocket:
         """Mock close method."""
         self.closed = True
 
-    def add_message(self, message: str) -> None:
+    def add_message(self, message: Union[str, bytes]) -> None:
         """Add a message to be received."""
         self._messages_to_receive.append(message)
 
@@ -126,12 +183,11 @@ class MockWebSocket:
 
     async def __anext__(self):
         """Get next message."""
-        if self._receive_index >= len(self._messages_to_receive):
-            raise StopAsyncIteration
-
-        message = self._messages_to_receive[self._receive_index]
-        self._receive_index += 1
-        return message
+        # Pop consumed messages so they can be reclaimed during long runs
+        try:
+            return self._messages_to_receive.popleft()
+        except IndexError:
+            raise StopAsyncIteration from None
 
 
 class HypeRateTestCase(unittest.TestCase):
@@ -152,19 +208,17 @@ class HypeRateTestCase(unittest.TestCase):
         """Clean up after tests."""
         self.log_patcher.stop()
 
-    def create_test_message(self, topic: str, payload: Dict[str, Any]) -> str:
-        """Create a test message JSON string."""
-        import json
+    def create_test_message(self, topic: str, payload: Dict[str, Any]) -> bytes:
+        """Create a test message as UTF-8 encoded JSON."""
+        return _dumpb({"topic": topic, "payload": payload})
 
-        return json.dumps({"topic": topic, "payload": payload})
-
-    def create_heartbeat_message(self, device_id: str, hr: int) -> str:
+    def create_heartbeat_message(self, device_id: str, hr: int) -> bytes:
         """Create a heartbeat message."""
-        return self.create_test_message(f"hr:{device_id}", {"hr": hr})
+        return _single_field_message(f"hr:{device_id}", "hr", hr)
 
-    def create_clip_message(self, device_id: str, slug: str) -> str:
+    def create_clip_message(self, device_id: str, slug: str) -> bytes:
         """Create a clip message."""
-        return self.create_test_message(f"clips:{device_id}", {"twitch_slug": slug})
+        return _single_field_message(f"clips:{device_id}", "twitch_slug", slug)
 
 
 class AsyncHypeRateTestCase(unittest.IsolatedAsyncioTestCase, HypeRateTestCase):
@@ -180,6 +234,17 @@ class AsyncHypeRateTestCase(unittest.IsolatedAsyncioTestCase, HypeRateTestCase):
         HypeRateTestCase.tearDown(self)
 
 
+# Invalid message patterns, cycled through by generate_invalid_messages
+_INVALID_MESSAGE_PATTERNS = (
+    "invalid json",
+    '{"topic": "hr:test"}',  # Missing payload
+    '{"payload": {"hr": 75}}',  # Missing topic
+    '{"topic": "", "payload": {"hr": 75}}',  # Empty topic
+    '{"topic": "hr:", "payload": {"hr": 75}}',  # Empty device ID
+    '{"topic": "unknown:test", "payload": {"data": "value"}}',  # Unknown topic
+)
+
+
 class TestDataGenerator:
     """Generate test data for various scenarios."""
 
@@ -188,41 +253,34 @@ class TestDataGenerator:
         device_id: str, count: int, base_hr: int = 70, variation: int = 30
     ) -> List[str]:
         """Generate a sequence of heartbeat messages."""
-        import json
-
-        messages = []
-        for i in range(count):
-            hr = base_hr + (i % variation)
-            message = json.dumps(
-                {"topic": f"hr:{device_id}", "payload": {"hr": hr, "timestamp": i}}
-            )
-            messages.append(message)
-        return messages
+        # The payload only contains integers, so the JSON can be built from a
+        # prebuilt prefix instead of serializing a fresh dict per message.
+        topic = _dumps(f"hr:{device_id}")
+        prefix = f'{{"topic":{topic},"payload":{{"hr":'
+        return [
+            f'{prefix}{base_hr + (i % variation)},"timestamp":{i}}}}}'
+            for i in range(count)
+        ]
 
     @staticmethod
     def generate_mixed_messages(device_ids: List[str], count: int) -> List[str]:
         """Generate mixed heartbeat and clip messages."""
-        import json
-        import random
+        # Draw all device IDs and heart rates up front in two batched calls
+        # instead of one choice()/randint() call per message.
+        chosen_ids = random.choices(device_ids, k=count)
+        heart_rates = random.choices(range(60, 181), k=count)
 
         messages = []
-
-        for i in range(count):
-            device_id = random.choice(device_ids)
-
+        for i, (device_id, hr) in enumerate(zip(chosen_ids, heart_rates)):
             if i % 10 == 0:  # 10% clip messages
-                message = json.dumps(
+                message = _dumps(
                     {
                         "topic": f"clips:{device_id}",
                         "payload": {"twitch_slug": f"clip_{i}"},
                     }
                 )
             else:  # 90% heartbeat messages
-                hr = random.randint(60, 180)
-                message = json.dumps(
-                    {"topic": f"hr:{device_id}", "payload": {"hr": hr}}
-                )
-
+                message = _dumps({"topic": f"hr:{device_id}", "payload": {"hr": hr}})
             messages.append(message)
 
         return messages
@@ -230,22 +288,12 @@ class TestDataGenerator:
     @staticmethod
     def generate_invalid_messages(count: int) -> List[str]:
         """Generate invalid messages for error testing."""
-        invalid_messages = [
-            "invalid json",
-            '{"topic": "hr:test"}',  # Missing payload
-            '{"payload": {"hr": 75}}',  # Missing topic
-            '{"topic": "", "payload": {"hr": 75}}',  # Empty topic
-            '{"topic": "hr:", "payload": {"hr": 75}}',  # Empty device ID
-            '{"topic": "unknown:test", "payload": {"data": "value"}}',  # Unknown topic
-        ]
-
         # Cycle through invalid patterns
-        messages = []
-        for i in range(count):
-            pattern = invalid_messages[i % len(invalid_messages)]
-            messages.append(pattern)
+        return list(itertools.islice(itertools.cycle(_INVALID_MESSAGE_PATTERNS), count))
 
-        return messages
+
+# Shared loader for the create_*_test_suite helpers
+_TEST_LOADER = unittest.TestLoader()
 
 
 def create_performance_test_suite() -> unittest.TestSuite:
@@ -257,9 +305,9 @@ def create_performance_test_suite() -> unittest.TestSuite:
     )
 
     suite = unittest.TestSuite()
-    suite.addTest(unittest.makeSuite(TestPerformanceBenchmarks))
-    suite.addTest(unittest.makeSuite(TestStressTests))
-    suite.addTest(unittest.makeSuite(TestAsyncPerformance))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestPerformanceBenchmarks))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestStressTests))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestAsyncPerformance))
     return suite
 
 
@@ -273,10 +321,10 @@ def create_integration_test_suite() -> unittest.TestSuite:
     )
 
     suite = unittest.TestSuite()
-    suite.addTest(unittest.makeSuite(TestRealWorldScenarios))
-    suite.addTest(unittest.makeSuite(TestPerformanceScenarios))
-    suite.addTest(unittest.makeSuite(TestEdgeIntegrationScenarios))
-    suite.addTest(unittest.makeSuite(TestRegressionScenarios))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestRealWorldScenarios))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestPerformanceScenarios))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestEdgeIntegrationScenarios))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestRegressionScenarios))
     return suite
 
 
@@ -297,60 +345,98 @@ def create_unit_test_suite() -> unittest.TestSuite:
     )
 
     suite = unittest.TestSuite()
-    suite.addTest(unittest.makeSuite(TestHypeRateInitialization))
-    suite.addTest(unittest.makeSuite(TestHypeRateEventHandling))
-    suite.addTest(unittest.makeSuite(TestHypeRateConnection))
-    suite.addTest(unittest.makeSuite(TestHypeRatePacketSending))
-    suite.addTest(unittest.makeSuite(TestHypeRateChannelManagement))
-    suite.addTest(unittest.makeSuite(TestHypeRateMessageHandling))
-    suite.addTest(unittest.makeSuite(TestHypeRateBackgroundTasks))
-    suite.addTest(unittest.makeSuite(TestDevice))
-    suite.addTest(unittest.makeSuite(TestHypeRateIntegration))
-    suite.addTest(unittest.makeSuite(TestHypeRateLogging))
-    suite.addTest(unittest.makeSuite(TestHypeRateEdgeCases))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateInitialization))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateEventHandling))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateConnection))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRatePacketSending))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateChannelManagement))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateMessageHandling))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateBackgroundTasks))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestDevice))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateIntegration))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateLogging))
+    suite.addTest(_TEST_LOADER.loadTestsFromTestCase(TestHypeRateEdgeCases))
     return suite
 
 
 def run_all_tests(verbosity: int = 2) -> bool:
-    """Run all test suites."""
+    """Run the unit, integration and performance suites in worker processes."""
     print("=" * 80)
     print("RUNNING COMPLETE HYPERATE TEST SUITE")
     print("=" * 80)
 
-    # Create master test suite
-    master_suite = unittest.TestSuite()
-    master_suite.addTest(create_unit_test_suite())
-    master_suite.addTest(create_integration_test_suite())
-    master_suite.addTest(create_performance_test_suite())
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as report_dir:
+        report_file = os.path.join(report_dir, "report.xml")
+        # Same scope as the unit, integration and performance suites above:
+        # no real API tests and no pytest-benchmark microbenchmarks
+        cmd = [
+            sys.executable,
+            "-m",
+            "pytest",
+            tests_dir,
+            "-m",
+            "unit or integration or performance",
+            "--ignore",
+            os.path.join(tests_dir, "test_benchmarks.py"),
+            f"--junitxml={report_file}",
+        ]
+
+        # Shard the suite across one worker per CPU when pytest-xdist is available
+        if importlib.util.find_spec("xdist") is not None:
+            cmd += ["-n", str(os.cpu_count() or 1)]
+        else:
+            print("pytest-xdist not installed, running tests in a single process")
 
-    # Run all tests
-    runner = unittest.TextTestRunner(verbosity=verbosity)
-    result = runner.run(master_suite)
+        cmd.append("-v" if verbosity > 1 else "-q")
+
+        result = subprocess.run(cmd, check=False, cwd=os.path.dirname(tests_dir))
+
+        try:
+            report = ElementTree.parse(report_file).getroot()
+        except (OSError, ElementTree.ParseError):
+            report = None
 
     # Print summary
     print("=" * 80)
     print("TEST SUITE SUMMARY")
     print("=" * 80)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    print(
-        f"Success rate: {((result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun * 100):.1f}%"
-    )
-
-    if result.failures:
-        print(f"\nFAILURES ({len(result.failures)}):")
-        for test, traceback in result.failures:
+    if report is None:
+        print(f"No test report was written (pytest exit code {result.returncode})")
+        print("=" * 80)
+        return False
+
+    tests_run = sum(int(suite.get("tests", 0)) for suite in report.iter("testsuite"))
+    failures = [
+        f"{case.get('classname')}.{case.get('name')}"
+        for case in report.iter("testcase")
+        if case.find("failure") is not None
+    ]
+    errors = [
+        f"{case.get('classname')}.{case.get('name')}"
+        for case in report.iter("testcase")
+        if case.find("error") is not None
+    ]
+    print(f"Tests run: {tests_run}")
+    print(f"Failures: {len(failures)}")
+    print(f"Errors: {len(errors)}")
+    if tests_run:
+        passed = tests_run - len(failures) - len(errors)
+        print(f"Success rate: {passed / tests_run * 100:.1f}%")
+
+    if failures:
+        print(f"\nFAILURES ({len(failures)}):")
+        for test in failures:
             print(f"  - {test}")
 
-    if result.errors:
-        print(f"\nERRORS ({len(result.errors)}):")
-        for test, traceback in result.errors:
+    if errors:
+        print(f"\nERRORS ({len(errors)}):")
+        for test in errors:
             print(f"  - {test}")
 
     print("=" * 80)
 
-    return result.wasSuccessful()
+    return result.returncode == 0
 
 
 # Pytest configuration and fixtures
@@ -374,15 +460,6 @@ def test_messages():
     return TestDataGenerator.generate_heartbeat_sequence("test_device", 10)
 
 
-# Test markers
-pytest.mark.unit = pytest.mark.unit  # Unit tests
-pytest.mark.integration = pytest.mark.integration  # Integration tests
-pytest.mark.performance = pytest.mark.performance  # Performance tests
-pytest.mark.slow = pytest.mark.slow  # Slow running tests
-
-
 if __name__ == "__main__":
-    import sys
-
     success = run_all_tests()
     sys.exit(0 if success else 1)
@@ -8,10 +8,18 @@ token input and providing clear instructions.
 import argparse
 import getpass
 import os
-import subprocess
 import sys
 from typing import Optional
 
+import pytest
+
+# Prefixes of environment variable references that were never expanded by the
+# shell, e.g. "${HYPERATE_API_TOKEN}"
+UNEXPANDED_TOKEN_PREFIXES = ("${",)
+
+# Shortest token length accepted as a real API token
+MIN_TOKEN_LENGTH = 10
+
 
 def get_token_from_input() -> Optional[str]:
     """Prompt user for API token securely."""
@@ -26,7 +34,7 @@ def get_token_from_input() -> Optional[str]:
         if not token:
             print("No token provided.")
             return None
-        if token.startswith("${") or len(token) < 10:
+        if len(token) < MIN_TOKEN_LENGTH or token.startswith(UNEXPANDED_TOKEN_PREFIXES):
             print("Invalid token format. Please provide a valid API token.")
             return None
         return token
@@ -143,32 +151,32 @@ def run_tests_with_token(token: str, extra_args: list = None) -> int:
     if len(safe_extra_args) != len(extra_args):
         print("Some command line arguments were filtered for security reasons.")
 
-    # Set environment variable
-    env = os.environ.copy()
-    env["HYPERATE_API_TOKEN"] = token
-
-    # Build pytest command with validated arguments
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
+    # Build pytest arguments with validated extra arguments
+    pytest_args = [
         "Tests/test_real_integration.py",
         "-v",
         "--tb=short",
     ] + safe_extra_args
 
     # Safe display of command (don't show actual token)
-    display_cmd = cmd[:-len(safe_extra_args)] + safe_extra_args if safe_extra_args else cmd
-    print(f"Running: {' '.join(display_cmd[:-1])} --token=***")
+    print(f"Running: pytest {' '.join(pytest_args)} --token=***")
     print(f"Using token: {token[:8]}...")
     print()
 
+    # Run pytest in this interpreter instead of spawning a new one, exposing
+    # the token through the environment only for the duration of the run
+    previous_token = os.environ.get("HYPERATE_API_TOKEN")
+    os.environ["HYPERATE_API_TOKEN"] = token
     try:
-        result = subprocess.run(cmd, env=env, check=False)
-        return result.returncode
+        return int(pytest.main(pytest_args))
     except Exception as e:
         print(f"Error running tests: {e}")
         return 1
+    finally:
+        if previous_token is None:
+            os.environ.pop("HYPERATE_API_TOKEN", None)
+        else:
+            os.environ["HYPERATE_API_TOKEN"] = previous_token
 
 
 def main():
@@ -205,7 +213,7 @@ Examples:
 
     if args.token:
         token = args.token.strip()
-        if token.startswith("${"):
+        if token.startswith(UNEXPANDED_TOKEN_PREFIXES):
             print("Warning: Token appears to be an unexpanded environment variable.")
             token = None
 
@@ -213,7 +221,7 @@ Examples:
         token = os.environ.get("HYPERATE_API_TOKEN")
         if not token:
             print("HYPERATE_API_TOKEN environment variable is not set.")
-        elif token.startswith("${"):
+        elif token.startswith(UNEXPANDED_TOKEN_PREFIXES):
             print("Warning: Environment variable contains unexpanded shell variable.")
             token = None
 
@@ -231,7 +239,7 @@ Examples:
         return 1
 
     # Validate token format
-    if len(token) < 10:
+    if len(token) < MIN_TOKEN_LENGTH:
         print("Error: Token appears to be too short. Please check your API token.")
         return 1
 
@@ -13,70 +13,248 @@ Examples:
     python run_tests.py --all                             # Run all tests
     python run_tests.py --unit                            # Run only unit tests
     python run_tests.py --integration                     # Run only integration tests
-    python run_tests.py --real-integration --token=TOKEN  # Run real API integration tests
+    python run_tests.py --real-integration --token=TOKEN  # Run real API tests
     python run_tests.py --performance                     # Run only performance tests
     python run_tests.py --coverage                        # Run tests with coverage
     python run_tests.py --benchmark                       # Run benchmark tests
     python run_tests.py --parallel                        # Run tests in parallel
 """
 import argparse
+import concurrent.futures
+import contextlib
+import functools
+import importlib.metadata
+import importlib.util
 import os
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
+from typing import Iterator, Optional
 
 
-def get_project_root() -> Path:
-    """Get the project root directory."""
-    current_dir = Path(__file__).parent
+def _find_project_root() -> Path:
+    """Locate the project root directory relative to this script."""
+    current_dir = Path(__file__).resolve().parent
     # If we're in the Tests folder, go up one level to project root
     if current_dir.name == "Tests":
         return current_dir.parent
     return current_dir
 
 
-def run_command(cmd: list, description: str) -> bool:
-    """Run a command and return True if successful."""
+# Resolved once at import; every stage runs from the project root
+_PROJECT_ROOT: Path = _find_project_root()
+
+
+def get_project_root() -> Path:
+    """Get the project root directory."""
+    return _PROJECT_ROOT
+
+
+# When True, pytest stages run in a separate interpreter (--subprocess)
+_USE_SUBPROCESS = False
+
+# Serializes output from commands that finish on different threads
+_PRINT_LOCK = threading.Lock()
+
+# With --fail-fast, the first failing stage sets the stop event, which
+# terminates running commands and skips all remaining stages
+_FAIL_FAST = False
+_STOP_EVENT = threading.Event()
+
+# When True, pytest stages rerun only last run's failures (--fast)
+_LAST_FAILED = False
+
+
+@contextlib.contextmanager
+def _working_directory(path: Path) -> Iterator[None]:
+    """Temporarily change the current working directory."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def run_command(
+    cmd: list, description: str, capture: bool = False, env: Optional[dict] = None
+) -> bool:
+    """
+    Run a command and return True if successful.
+
+    Output is streamed line by line as the command produces it. With
+    capture=True it is buffered instead and printed together with its banner
+    once the command finishes, so commands running concurrently in other
+    threads don't interleave their output. Under --fail-fast, a failure stops
+    every command that is still running and skips the ones that follow.
+    env replaces the environment the command runs with.
+    """
+    banner = (
+        f"\n{'='*60}\n"
+        f"Running: {description}\n"
+        f"Command: {' '.join(cmd)}\n"
+        f"{'='*60}"
+    )
+    if _STOP_EVENT.is_set():
+        with _PRINT_LOCK:
+            print(f"\n⏭️  Skipping {description} after an earlier failure")
+        return False
+    if not capture:
+        print(banner)
+
+    output = []
+    stopped = False
+    start_time = time.time()
+    # Change to project root directory for running commands
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        text=True,
+        errors="replace",
+        cwd=_PROJECT_ROOT,
+        env=env,
+    ) as proc:
+        for line in proc.stdout:
+            if capture:
+                output.append(line)
+            else:
+                sys.stdout.write(line)
+            if _STOP_EVENT.is_set():
+                proc.terminate()
+                stopped = True
+                break
+        returncode = proc.wait()
+    end_time = time.time()
+
+    if returncode == 0:
+        summary = (
+            f"\n✅ {description} completed successfully in {end_time - start_time:.2f}s"
+        )
+    elif stopped:
+        summary = f"\n⏹️  {description} stopped after an earlier failure"
+    else:
+        summary = (
+            f"\n❌ {description} failed after {end_time - start_time:.2f}s\n"
+            f"Exit code: {returncode}"
+        )
+        if _FAIL_FAST:
+            _STOP_EVENT.set()
+
+    with _PRINT_LOCK:
+        if capture:
+            print(banner)
+            print("".join(output), end="")
+        print(summary)
+    return returncode == 0
+
+
+def run_pytest(args: list, description: str, isolated: bool = False) -> bool:
+    """
+    Run pytest with the given arguments and return True if successful.
+
+    Pytest runs inside this interpreter so that pytest, its plugins and the
+    library are only imported once per invocation. Stages that need a fresh
+    interpreter (e.g. coverage, which must start before the library is first
+    imported) pass isolated=True, as does every stage when --subprocess is used.
+    """
+    if _FAIL_FAST:
+        args = list(args) + ["-x"]
+    # Coverage stages keep the full run, or they would miss their threshold
+    if _LAST_FAILED and not any(arg.startswith("--cov") for arg in args):
+        args = list(args) + ["--lf"]
+    if isolated or _USE_SUBPROCESS:
+        return run_command([sys.executable, "-m", "pytest"] + args, description)
+
+    if _STOP_EVENT.is_set():
+        print(f"\n⏭️  Skipping {description} after an earlier failure")
+        return False
+
+    import pytest
+
     print(f"\n{'='*60}")
     print(f"Running: {description}")
-    print(f"Command: {' '.join(cmd)}")
+    print(f"Command: pytest {' '.join(args)}")
     print(f"{'='*60}")
 
     start_time = time.time()
-    try:
-        # Change to project root directory for running commands
-        project_root = get_project_root()
-        result = subprocess.run(cmd, check=True, capture_output=False, cwd=project_root)
-        end_time = time.time()
+    with _working_directory(_PROJECT_ROOT):
+        exit_code = pytest.main(list(args))
+    end_time = time.time()
+
+    if exit_code == 0:
         print(
             f"\n✅ {description} completed successfully in {end_time - start_time:.2f}s"
         )
         return True
-    except subprocess.CalledProcessError as e:
-        end_time = time.time()
-        print(f"\n❌ {description} failed after {end_time - start_time:.2f}s")
-        print(f"Exit code: {e.returncode}")
-        return False
+
+    print(f"\n❌ {description} failed after {end_time - start_time:.2f}s")
+    print(f"Exit code: {int(exit_code)}")
+    if _FAIL_FAST:
+        _STOP_EVENT.set()
+    return False
+
+
+# Installed pytest plugins that each stage does not use. Skipping them saves
+# their import and hook registration cost when the stage starts.
+_REPORTING_PLUGINS = ("html", "html_fixtures")
+_XDIST_PLUGINS = ("xdist", "xdist.looponfail")
+_PLUGIN_DISABLE = {
+    "unit": ("pytest_cov", "benchmark") + _XDIST_PLUGINS + _REPORTING_PLUGINS,
+    "integration": ("pytest_cov", "benchmark") + _XDIST_PLUGINS + _REPORTING_PLUGINS,
+    "performance": ("pytest_cov",) + _XDIST_PLUGINS + _REPORTING_PLUGINS,
+    "stress": ("pytest_cov",) + _XDIST_PLUGINS + _REPORTING_PLUGINS,
+    "benchmark": ("pytest_cov",) + _XDIST_PLUGINS + _REPORTING_PLUGINS,
+    # Benchmark tests request the benchmark fixture, so it has to stay loaded
+    "coverage": _XDIST_PLUGINS + _REPORTING_PLUGINS,
+}
+
+
+def plugin_args(stage: str) -> list:
+    """Return pytest arguments that disable the plugins a stage doesn't use."""
+    args = []
+    for plugin in _PLUGIN_DISABLE.get(stage, ()):
+        args += ["-p", f"no:{plugin}"]
+    return args
+
+
+def parallel_args() -> list:
+    """
+    Return pytest-xdist arguments for running tests across all CPUs.
+
+    Work stealing lets idle workers take tests from busy ones, so a long
+    running scope (e.g. the stress tests) doesn't leave other workers idle.
+    Falls back to a single process when pytest-xdist is not installed.
+    """
+    try:
+        importlib.metadata.version("pytest-xdist")
+    except importlib.metadata.PackageNotFoundError:
+        print("⚠️  pytest-xdist not installed, running tests in a single process")
+        return []
+
+    # Keep hashing deterministic across workers
+    os.environ.setdefault("PYTHONHASHSEED", "0")
+
+    return ["-n", "auto", "--dist=worksteal"]
 
 
 def run_unit_tests() -> bool:
     """Run unit tests."""
-    cmd = ["python", "-m", "pytest", "Tests/test_hyperate.py", "-v"]
-    return run_command(cmd, "Unit Tests")
+    args = ["Tests/test_hyperate.py", "-v"] + plugin_args("unit")
+    return run_pytest(args, "Unit Tests")
 
 
 def run_integration_tests() -> bool:
     """Run integration tests."""
-    cmd = [
-        "python",
-        "-m",
-        "pytest",
+    args = [
         "Tests/test_mocked_scenarios.py",
         "Tests/test_mocked_simple.py",
         "-v",
-    ]
-    return run_command(cmd, "Mocked Scenario Tests")
+    ] + plugin_args("integration")
+    return run_pytest(args, "Mocked Scenario Tests")
 
 
 def run_real_integration_tests(token: str = None) -> bool:
@@ -90,59 +268,34 @@ def run_real_integration_tests(token: str = None) -> bool:
         return True  # Not a failure, just skipped
 
     # Set the token as an environment variable for the test
-    env = os.environ.copy()
-    env["HYPERATE_API_TOKEN"] = token
-    
+    env = {**os.environ, "HYPERATE_API_TOKEN": token}
     cmd = [
-        "python",
+        sys.executable,
         "-m",
         "pytest",
         "Tests/test_real_integration.py",
         "-v",
         "-s",
     ]
-    
-    print(f"\n{'='*60}")
-    print(f"Running: Real Integration Tests")
-    print(f"Command: {' '.join(cmd)}")
-    print(f"Token: {token[:8]}..." if token else "No token")
-    print(f"{'='*60}")
-
-    start_time = time.time()
-    try:
-        # Change to project root directory for running commands
-        project_root = get_project_root()
-        result = subprocess.run(cmd, check=True, capture_output=False, cwd=project_root, env=env)
-        end_time = time.time()
-        print(
-            f"\n✅ Real Integration Tests completed successfully in {end_time - start_time:.2f}s"
-        )
-        return True
-    except subprocess.CalledProcessError as e:
-        end_time = time.time()
-        print(f"\n❌ Real Integration Tests failed after {end_time - start_time:.2f}s")
-        print(f"Exit code: {e.returncode}")
-        return False
+    print(f"\nToken: {token[:8]}...")
+    return run_command(cmd, "Real Integration Tests", env=env)
 
 
 def run_performance_tests() -> bool:
     """Run performance tests."""
-    cmd = ["python", "-m", "pytest", "Tests/test_performance.py", "-v", "-s"]
-    return run_command(cmd, "Performance Tests")
+    args = ["Tests/test_performance.py", "-v", "-s"] + plugin_args("performance")
+    return run_pytest(args, "Performance Tests")
 
 
 def run_all_tests() -> bool:
     """Run all tests."""
-    cmd = ["python", "-m", "pytest", "Tests/", "-v"]
-    return run_command(cmd, "All Tests")
+    args = ["Tests/", "-v"]
+    return run_pytest(args, "All Tests")
 
 
 def run_tests_with_coverage() -> bool:
     """Run tests with coverage reporting."""
-    cmd = [
-        "python",
-        "-m",
-        "pytest",
+    args = [
         "Tests/",
         "--cov=lib.hyperate",
         "--cov-report=html",
@@ -150,78 +303,111 @@ def run_tests_with_coverage() -> bool:
         "--cov-report=xml",
         "--cov-fail-under=85",
         "-v",
-    ]
-    return run_command(cmd, "Tests with Coverage")
+    ] + plugin_args("coverage")
+    return run_pytest(args, "Tests with Coverage", isolated=True)
 
 
-def run_benchmark_tests() -> bool:
-    """Run benchmark tests."""
-    cmd = [
-        "python",
+def run_combined_tests_with_coverage() -> bool:
+    """
+    Run unit, integration and performance tests in one session with coverage.
+
+    Collection, plugin loading and coverage measurement happen once for all
+    three categories instead of once per category.
+    """
+    args = [
+        "Tests/",
         "-m",
-        "pytest",
-        "Tests/test_performance.py",
-        "--benchmark-only",
-        "--benchmark-sort=mean",
-        "--benchmark-compare-fail=mean:5%",
+        "unit or integration or performance",
+        "--cov=lib.hyperate",
+        "--cov-report=html",
+        "--cov-report=term-missing",
+        "--cov-report=xml",
+        "--cov-fail-under=85",
         "-v",
-    ]
-    return run_command(cmd, "Benchmark Tests")
+    ] + parallel_args()
+    return run_pytest(args, "Unit, Integration and Performance Tests", isolated=True)
+
+
+# Timing options shared by every benchmark run. Results are only comparable
+# between runs using the same options, so CI passes these flags too.
+BENCHMARK_TIMING_ARGS = [
+    "--benchmark-disable-gc",
+    "--benchmark-warmup=on",
+    "--benchmark-warmup-iterations=5",
+]
+
+
+def run_benchmark_tests() -> bool:
+    """Run benchmark tests."""
+    args = (
+        [
+            "Tests/test_performance.py",
+            "--benchmark-only",
+            "--benchmark-sort=mean",
+            "--benchmark-compare-fail=mean:5%",
+            "-v",
+        ]
+        + BENCHMARK_TIMING_ARGS
+        + plugin_args("benchmark")
+    )
+    return run_pytest(args, "Benchmark Tests")
 
 
 def run_parallel_tests() -> bool:
     """Run tests in parallel."""
-    cmd = [
-        "python",
-        "-m",
-        "pytest",
-        "Tests/",
-        "-n",
-        "auto",  # Use all available CPUs
-        "--dist=loadscope",
-        "-v",
-    ]
-    return run_command(cmd, "Parallel Tests")
+    args = ["Tests/", "-v"] + parallel_args()
+    return run_pytest(args, "Parallel Tests")
 
 
 def run_stress_tests() -> bool:
     """Run stress tests specifically."""
-    cmd = [
-        "python",
-        "-m",
-        "pytest",
+    args = [
         "Tests/test_performance.py::TestStressTests",
         "-v",
         "-s",
+    ] + plugin_args("stress")
+    return run_pytest(args, "Stress Tests")
+
+
+def run_linting(serial: bool = False) -> bool:
+    """
+    Run code quality checks.
+
+    The linters are independent and each one blocks in its own subprocess,
+    so they run concurrently on a thread pool unless serial is True.
+    """
+    jobs = [
+        (
+            [
+                sys.executable,
+                "-m",
+                "pylint",
+                "lib/hyperate/",
+                "--output-format=text",
+                "--fail-under=10.0",
+            ],
+            "PyLint Check",
+        ),
+        (
+            [sys.executable, "-m", "mypy", "lib/hyperate/", "--strict"],
+            "Mypy Type Check",
+        ),
+        ([sys.executable, "-m", "flake8", "lib/hyperate/"], "Flake8 Style Check"),
     ]
-    return run_command(cmd, "Stress Tests")
-
-
-def run_linting() -> bool:
-    """Run code quality checks."""
-    success = True
 
-    # PyLint
-    cmd = ["python", "-m", "pylint", "lib/hyperate/", "--output-format=text", "--fail-under=10.0"]
-    success &= run_command(cmd, "PyLint Check")
+    if serial:
+        return all([run_command(cmd, description) for cmd, description in jobs])
 
-    # Mypy
-    cmd = ["python", "-m", "mypy", "lib/hyperate/", "--strict"]
-    success &= run_command(cmd, "Mypy Type Check")
-
-    # Flake8
-    cmd = ["python", "-m", "flake8", "lib/hyperate/"]
-    success &= run_command(cmd, "Flake8 Style Check")
-
-    return success
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        results = executor.map(
+            lambda job: run_command(job[0], job[1], capture=True), jobs
+        )
+        return all(list(results))
 
 
 def generate_test_report() -> bool:
     """Generate comprehensive test report."""
-    cmd = [
-        "python",
-        "-m",
-        "pytest",
+    args = [
         "Tests/",
         "--cov=lib.hyperate",
         "--cov-report=html",
@@ -230,9 +416,10 @@ def generate_test_report() -> bool:
         "--junit-xml=test-results.xml",
         "-v",
     ]
-    return run_command(cmd, "Test Report Generation")
+    return run_pytest(args, "Test Report Generation", isolated=True)
 
 
+@functools.lru_cache(maxsize=1)
 def check_test_dependencies() -> bool:
     """Check if all test dependencies are installed."""
     print("Checking test dependencies...")
@@ -249,9 +436,8 @@ def check_test_dependencies() -> bool:
     missing_packages = []
 
     for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
-        except ImportError:
+        # Locate the module without importing (and executing) it
+        if importlib.util.find_spec(package.replace("-", "_")) is None:
             missing_packages.append(package)
 
     if missing_packages:
@@ -312,6 +498,11 @@ Examples:
     )
     parser.add_argument("--parallel", action="store_true", help="Run tests in parallel")
     parser.add_argument("--lint", action="store_true", help="Run code quality checks")
+    parser.add_argument(
+        "--lint-serial",
+        action="store_true",
+        help="Run the code quality checks one after another (for debugging)",
+    )
     parser.add_argument(
         "--report", action="store_true", help="Generate comprehensive test report"
     )
@@ -319,15 +510,42 @@ Examples:
         "--check-deps", action="store_true", help="Check test dependencies"
     )
     parser.add_argument("--quick", action="store_true", help="Run quick smoke tests")
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop at the first failing test or check and skip remaining stages",
+    )
     parser.add_argument(
         "--token", type=str, help="API token for real integration tests"
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=(
+            "Rerun only the tests that failed last time (pytest --lf, or every "
+            "test if none failed) and skip the dependency check"
+        ),
+    )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help="Run each pytest stage in a separate interpreter",
+    )
 
     args = parser.parse_args()
 
-    # Check dependencies first
-    if args.check_deps or not check_test_dependencies():
-        return 1 if not check_test_dependencies() else 0
+    global _USE_SUBPROCESS, _FAIL_FAST, _LAST_FAILED
+    _USE_SUBPROCESS = args.subprocess
+    _FAIL_FAST = args.fail_fast
+    _LAST_FAILED = args.fast
+
+    # Check dependencies first; --fast skips this unless asked for explicitly
+    if args.check_deps or not args.fast:
+        deps_ok = check_test_dependencies()
+        if args.check_deps:
+            return 0 if deps_ok else 1
+        if not deps_ok:
+            return 1
 
     # Default to all tests if no specific option is given
     if not any(
@@ -360,14 +578,11 @@ Examples:
         ]
         success &= run_command(cmd, "Quick Import Test")
 
-        cmd = [
-            "python",
-            "-m",
-            "pytest",
+        pytest_args = [
             "Tests/test_hyperate.py::TestHypeRateInitialization",
             "-v",
-        ]
-        success &= run_command(cmd, "Quick Unit Test")
+        ] + plugin_args("unit")
+        success &= run_pytest(pytest_args, "Quick Unit Test")
 
     elif args.unit:
         success &= run_unit_tests()
@@ -394,7 +609,7 @@ Examples:
         success &= run_parallel_tests()
 
     elif args.lint:
-        success &= run_linting()
+        success &= run_linting(serial=args.lint_serial)
 
     elif args.report:
         success &= generate_test_report()
@@ -402,14 +617,16 @@ Examples:
     elif args.all:
         # Run comprehensive test suite
         print("Running comprehensive test suite...")
-        success &= run_linting()
-        success &= run_unit_tests()
-        success &= run_integration_tests()
-        success &= run_real_integration_tests(
-            args.token
-        )  # Pass token for real integration tests
-        success &= run_performance_tests()
-        success &= run_tests_with_coverage()
+        stages = [
+            lambda: run_linting(serial=args.lint_serial),
+            # Pass token for real integration tests
+            lambda: run_real_integration_tests(args.token),
+            run_combined_tests_with_coverage,
+        ]
+        for stage in stages:
+            success &= stage()
+            if not success and args.fail_fast:
+                break
 
     # Print final summary
     print(f"\n{'='*80}")
@@ -8,103 +8,199 @@ provide detailed performance measurements.
 import asyncio
 import gc
 import json
-import time
-from unittest.mock import AsyncMock, Mock, patch
+import tracemalloc
+from unittest.mock import Mock
 
 import pytest
 
 from lib.hyperate import Device, HypeRate
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in the test requirements
+    orjson = None
+
+pytestmark = pytest.mark.performance
+
+if orjson is not None:
+
+    def _dumps(obj):
+        """Serialize obj to a JSON string with orjson."""
+        return orjson.dumps(obj).decode()
+
+else:
+    _dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+# Benchmark inputs are immutable, so they are built once at import instead of
+# in every test body. Message corpora are serialized up front so benchmarks
+# only time handling.
+_MESSAGES_1K = tuple(
+    _dumps({"topic": f"hr:device{i % 100}", "payload": {"hr": 70 + (i % 30)}})
+    for i in range(1000)
+)
+_MESSAGES_200 = tuple(
+    _dumps({"topic": f"hr:device{i % 50}", "payload": {"hr": 70 + (i % 30)}})
+    for i in range(200)
+)
+_VALID_IDS = tuple(f"dev{i:04d}" for i in range(500))
+_INVALID_IDS = tuple(f"toolongdeviceid{i}" for i in range(500))
+_ALL_IDS = _VALID_IDS + _INVALID_IDS
+_PACKETS = tuple(
+    {
+        "topic": f"hr:device{i % 10}",
+        "event": "phx_join",
+        "payload": {"data": f"test_{i}"},
+        "ref": i,
+    }
+    for i in range(100)
+)
+_EXTRACT_INPUTS = tuple(
+    (
+        f"https://app.hyperate.io/dev{i:04d}",
+        f"http://app.hyperate.io/test{i:04d}",
+        f"dev{i:04d}",
+    )[i % 3]
+    for i in range(500)
+)
+
+
+def _noop_handler(*args):
+    """Event handler that does nothing."""
+
+
+class CallCounter:
+    """Minimal event handler that only counts its invocations."""
+
+    __slots__ = ("n",)
+
+    def __init__(self):
+        self.n = 0
+
+    def __call__(self, *args):
+        self.n += 1
+
+
+def _memory_load_operation(client, handler_factory=Mock):
+    """Register 100 handlers, process 200 messages, then remove the handlers."""
+    initial_size = len(client._event_handlers)
+
+    # Create handlers
+    for _ in range(100):
+        client.on("heartbeat", handler_factory())
+
+    # Process messages
+    for message in _MESSAGES_200:
+        client._handle_message(message)
+
+    final_size = sum(len(handlers) for handlers in client._event_handlers.values())
+
+    # Clean up in place, keeping the existing dict and lists
+    for event_handlers in client._event_handlers.values():
+        event_handlers.clear()
+
+    return final_size - initial_size
+
+
+class _SinkWebSocket:
+    """WebSocket stand-in that only records the frames sent to it."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(data)
+
+
+@pytest.fixture(scope="class")
+def client():
+    """Provide one HypeRate client, muted to ERROR level, per test class."""
+    client = HypeRate("test_token")
+    # Store original logger level to restore later
+    original_logger_level = client.logger.level
+    client.logger.setLevel(40)  # ERROR level only for benchmarks
+    yield client
+    client.logger.setLevel(original_logger_level)
+
 
 class TestBenchmarks:
     """Pytest-benchmark compatible performance tests."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.client = HypeRate("test_token")
-        # Store original logger level to restore later
-        self.original_logger_level = self.client.logger.level
-        self.client.logger.setLevel(40)  # ERROR level only for benchmarks
-
-    def teardown_method(self):
-        """Restore test fixtures."""
-        # Restore original logger level
-        self.client.logger.setLevel(self.original_logger_level)
+    @pytest.fixture(autouse=True)
+    def _reset_handlers(self, client):
+        """Start every benchmark without registered event handlers."""
+        for handlers in client._event_handlers.values():
+            handlers.clear()
 
-    def test_event_registration_benchmark(self, benchmark):
+    def test_event_registration_benchmark(self, benchmark, client):
         """Benchmark event handler registration."""
 
         def register_1000_handlers():
-            handlers = [Mock() for _ in range(1000)]
+            # Registration never calls the handlers, so a shared no-op function
+            # avoids timing 1000 Mock allocations per round
+            handlers = [_noop_handler] * 1000
             for i, handler in enumerate(handlers):
                 event_type = ["heartbeat", "clip", "connected", "disconnected"][i % 4]
-                self.client.on(event_type, handler)
+                client.on(event_type, handler)
             return len(handlers)
 
         result = benchmark(register_1000_handlers)
         assert result == 1000
 
-    def test_message_processing_benchmark(self, benchmark):
+    def test_message_processing_benchmark(self, benchmark, client):
         """Benchmark message processing."""
         # Setup
-        messages = []
-        for i in range(1000):
-            messages.append(
-                json.dumps(
-                    {"topic": f"hr:device{i % 100}", "payload": {"hr": 70 + (i % 30)}}
-                )
-            )
-
+        messages = _MESSAGES_1K
         processed_count = 0
 
         def count_handler(payload):
             nonlocal processed_count
             processed_count += 1
 
-        self.client.on("heartbeat", count_handler)
+        client.on("heartbeat", count_handler)
 
         def process_all_messages():
             nonlocal processed_count
             processed_count = 0
             for message in messages:
-                self.client._handle_message(message)
+                client._handle_message(message)
             return processed_count
 
         result = benchmark(process_all_messages)
         assert result == len(messages)
 
-    def test_event_firing_benchmark(self, benchmark):
+    def test_event_firing_benchmark(self, benchmark, client):
         """Benchmark event firing with multiple handlers."""
         # Setup
         handler_count = 100  # Reduced for faster benchmarking
-        handlers = [Mock() for _ in range(handler_count)]
+        # Counting handlers instead of Mocks, whose call recording would
+        # dominate the measured dispatch time
+        handlers = [CallCounter() for _ in range(handler_count)]
 
         for handler in handlers:
-            self.client.on("heartbeat", handler)
+            client.on("heartbeat", handler)
 
         test_payload = {"hr": 75}
 
         def fire_100_events():
             iterations = 100
             for _ in range(iterations):
-                self.client._fire_event("heartbeat", test_payload)
+                client._fire_event("heartbeat", test_payload)
             return iterations
 
         result = benchmark(fire_100_events)
         assert result == 100
 
-        # Verify handlers were called
-        for handler in handlers[:5]:  # Check first 5 handlers
-            assert handler.call_count > 0
+        # Verify every handler is called once per fired event
+        for handler in handlers:
+            handler.n = 0
+        fire_100_events()
+        assert sum(handler.n for handler in handlers) == handler_count * 100
 
     def test_device_validation_benchmark(self, benchmark):
         """Benchmark device ID validation."""
-        valid_ids = [f"dev{i:04d}" for i in range(500)]
-        invalid_ids = [f"toolongdeviceid{i}" for i in range(500)]
-        all_ids = valid_ids + invalid_ids
 
         def validate_all_devices():
-            return [Device.is_valid_device_id(device_id) for device_id in all_ids]
+            return [Device.is_valid_device_id(device_id) for device_id in _ALL_IDS]
 
         results = benchmark(validate_all_devices)
 
@@ -114,82 +210,85 @@ class TestBenchmarks:
         assert valid_count == 500
         assert invalid_count == 0
 
+    def test_device_validation_batch_benchmark(self, benchmark):
+        """Benchmark batch device ID validation."""
+        results = benchmark(Device.validate_batch, _ALL_IDS)
+
+        assert sum(results[:500]) == 500
+        assert sum(results[500:]) == 0
+
     def test_device_extraction_benchmark(self, benchmark):
         """Benchmark device ID extraction."""
-        test_inputs = []
-        for i in range(500):
-            if i % 3 == 0:
-                test_inputs.append(f"https://app.hyperate.io/dev{i:04d}")
-            elif i % 3 == 1:
-                test_inputs.append(f"http://app.hyperate.io/test{i:04d}")
-            else:
-                test_inputs.append(f"dev{i:04d}")
 
         def extract_all_devices():
-            return [Device.extract_device_id(input_str) for input_str in test_inputs]
+            return [
+                Device.extract_device_id(input_str) for input_str in _EXTRACT_INPUTS
+            ]
 
         results = benchmark(extract_all_devices)
         successful_extractions = sum(1 for result in results if result is not None)
-        assert successful_extractions == len(test_inputs)
-
-    def test_memory_usage_benchmark(self, benchmark):
-        """Benchmark memory usage under load."""
-
-        def memory_load_operation():
-            initial_size = len(self.client._event_handlers)
-
-            # Create handlers
-            handlers = []
-            for i in range(100):
-                handler = Mock()
-                handlers.append(handler)
-                self.client.on("heartbeat", handler)
-
-            # Process messages
-            for i in range(200):
-                message = json.dumps(
-                    {"topic": f"hr:device{i % 50}", "payload": {"hr": 70 + (i % 30)}}
-                )
-                self.client._handle_message(message)
-
-            final_size = sum(
-                len(handlers) for handlers in self.client._event_handlers.values()
-            )
-
-            # Clean up
-            self.client._event_handlers = {
-                key: [] for key in self.client._event_handlers
-            }
-            handlers.clear()
-            gc.collect()
+        assert successful_extractions == len(_EXTRACT_INPUTS)
+
+    def test_device_extraction_batch_benchmark(self, benchmark):
+        """Benchmark batch device ID extraction."""
+        results = benchmark(Device.extract_batch, _EXTRACT_INPUTS)
 
-            return final_size - initial_size
+        assert results == [Device.extract_device_id(s) for s in _EXTRACT_INPUTS]
 
-        result = benchmark(memory_load_operation)
+    def test_memory_load_throughput_benchmark(self, benchmark, client):
+        """Benchmark handler registration and message processing under load."""
+        # GC pauses are kept out of the timed rounds by --benchmark-disable-gc
+        result = benchmark(_memory_load_operation, client)
         assert result > 0  # Should have added some handlers
 
-    @pytest.mark.asyncio
-    async def test_packet_sending_benchmark(self, benchmark):
-        """Benchmark packet sending (simplified for sync benchmark)."""
-        mock_ws = Mock()
-        self.client.ws = mock_ws
+    def test_memory_load_delta(self, client):
+        """Test that repeated load operations don't grow memory unboundedly."""
+        # Counting handlers keep Mock call recording (slow under tracemalloc)
+        # out of the measurement. Warm up so one-off allocations (caches, list
+        # capacity) aren't counted.
+        _memory_load_operation(client, CallCounter)
+
+        tracemalloc.start()
+        try:
+            gc.collect()
+            before, _ = tracemalloc.get_traced_memory()
+            for _ in range(20):
+                _memory_load_operation(client, CallCounter)
+            gc.collect()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert after - before < 256 * 1024
+
+    def test_packet_sending_benchmark(self, benchmark, client):
+        """Benchmark sending 100 packets through the client."""
+        ws = _SinkWebSocket()
+        client.ws = ws
+        loop = asyncio.new_event_loop()
 
         def send_100_packets():
-            packet_count = 100
-            for i in range(packet_count):
-                packet = {
-                    "topic": f"hr:device{i % 10}",
-                    "event": "phx_join",
-                    "payload": {"data": f"test_{i}"},
-                    "ref": i,
-                }
-                # Simulate packet creation and serialization
-                json.dumps(packet)
-            return packet_count
-
-        result = benchmark(send_100_packets)
-        assert result == 100
+            ws.sent.clear()
+            loop.run_until_complete(client.send_packets(_PACKETS))
+            return ws.sent
+
+        try:
+            result = benchmark(send_100_packets)
+        finally:
+            loop.close()
+            client.ws = None
+        assert [json.loads(frame) for frame in result] == list(_PACKETS)
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "--benchmark-only", "--benchmark-sort=mean", "-v"])
+    pytest.main(
+        [
+            __file__,
+            "--benchmark-only",
+            "--benchmark-sort=mean",
+            "--benchmark-disable-gc",
+            "--benchmark-warmup=on",
+            "--benchmark-warmup-iterations=5",
+            "-v",
+        ]
+    )
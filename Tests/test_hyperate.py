@@ -16,15 +16,178 @@ import json
 import logging
 import re
 import unittest
-from typing import Any, Dict, List
-from unittest.mock import AsyncMock, MagicMock, Mock, call, patch
+from contextlib import ExitStack
+from typing import Any, List, Sequence
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import pytest
-import websockets
+import pytest_asyncio
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
 from lib.hyperate import Device, HypeRate
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in the test requirements
+    orjson = None
+
+pytestmark = pytest.mark.unit
+
+if orjson is not None:
+
+    def _dumps(obj):
+        """Serialize obj to a JSON string with orjson."""
+        return orjson.dumps(obj).decode()
+
+else:
+    _dumps = json.dumps
+
+_EXPECTED_EVENTS = frozenset(
+    {"connected", "disconnected", "heartbeat", "clip", "channel_joined", "channel_left"}
+)
+
+# websockets.connect as looked up by the client module at call time
+_CONNECT_TARGET = "lib.hyperate.hyperate.websockets.connect"
+
+# Serialized once; tests only pass them to _handle_message
+_HEARTBEAT_MSG = _dumps({"topic": "hr:test_device", "payload": {"hr": 75}})
+_HEARTBEAT_MSG_BYTES = _dumps(
+    {"topic": "hr:test_device", "payload": {"hr": 80}}
+).encode("utf-8")
+_HEARTBEAT_MSG_85 = _dumps({"topic": "hr:testdevice", "payload": {"hr": 85}})
+_HEARTBEAT_MSG_NO_SEPARATOR = _dumps({"topic": "hr", "payload": {"hr": 75}})
+_HEARTBEAT_MSG_NO_HR = _dumps(
+    {"topic": "hr:test_device", "payload": {"other_field": "value"}}
+)
+_CLIP_MSG = _dumps(
+    {"topic": "clips:test_device", "payload": {"twitch_slug": "test_clip_slug"}}
+)
+_CLIP_MSG_NO_SLUG = _dumps(
+    {"topic": "clips:test_device", "payload": {"other_field": "value"}}
+)
+_UNICODE_MSG = _dumps(
+    {"topic": "hr:test", "payload": {"hr": 75, "note": "???? ??"}}
+)
+_LARGE_PAYLOAD = {"data": "x" * 100000, "hr": 75}
+_LARGE_MSG = _dumps({"topic": "hr:test", "payload": _LARGE_PAYLOAD})
+_NESTED_PAYLOAD = {
+    "hr": 75,
+    "metadata": {
+        "device": {
+            "info": {
+                "version": "1.0",
+                "settings": {
+                    "enabled": True,
+                    "features": ["heartbeat", "clips"],
+                },
+            }
+        }
+    },
+}
+_NESTED_MSG = _dumps({"topic": "hr:test", "payload": _NESTED_PAYLOAD})
+_UNKNOWN_TOPIC_MSG = _dumps(
+    {
+        "topic": "unknown:test_device",
+        "event": "test_event",
+        "payload": {"data": "value"},
+    }
+)
+_PHX_JOIN_OK = _dumps(
+    {
+        "topic": "hr:test_device",
+        "event": "phx_reply",
+        "payload": {"status": "ok", "response": {}},
+        "ref": 1,
+    }
+)
+_PHX_LEAVE_OK = _dumps(
+    {
+        "topic": "clips:test_device",
+        "event": "phx_reply",
+        "payload": {"status": "ok", "response": {}},
+        "ref": 2,
+    }
+)
+_PHX_JOIN_ERROR = _dumps(
+    {
+        "topic": "hr:test_device",
+        "event": "phx_reply",
+        "payload": {"status": "error", "response": {"reason": "not_found"}},
+        "ref": 1,
+    }
+)
+_PHX_UNKNOWN_REF_DATA = {
+    "topic": "hr:test_device",
+    "event": "phx_reply",
+    "payload": {"status": "ok", "response": {}},
+    "ref": 999,  # Unknown ref
+}
+_PHX_UNKNOWN_REF = _dumps(_PHX_UNKNOWN_REF_DATA)
+
+
+class _RecHandler(logging.Handler):
+    """Logging handler that keeps every record it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Store the record."""
+        self.records.append(record)
+
+    def messages(self, level: int) -> List[str]:
+        """Return the formatted messages logged at the given level."""
+        return [r.getMessage() for r in self.records if r.levelno == level]
+
+
+# Clients built with _CAPTURE_LOGGER log through a child logger into _LOG, so
+# tests assert on recorded messages instead of patching logger methods
+_LOG = _RecHandler()
+_CAPTURE_LOGGER = logging.getLogger("test_hyperate")
+_CAPTURE_LOGGER.setLevel(logging.DEBUG)
+_CAPTURE_LOGGER.propagate = False
+_CAPTURE_LOGGER.addHandler(_LOG)
+
+
+class _FakeWS:
+    """Lightweight WebSocket stand-in that records sent data."""
+
+    def __init__(self):
+        self.sent: List[str] = []
+        self.closed = False
+        # Any sequence; tests assign shared tuples rather than fresh lists
+        self.messages: Sequence[Any] = ()
+        # Exceptions to raise from send() or when iteration starts
+        self.send_error: Any = None
+        self.receive_error: Any = None
+
+    async def send(self, data: str) -> None:
+        """Record data, or raise send_error if set."""
+        if self.send_error is not None:
+            raise self.send_error
+        self.sent.append(data)
+
+    async def close(self) -> None:
+        """Mark the connection closed."""
+        self.closed = True
+
+    @property
+    def sent_parsed(self) -> List[Any]:
+        """Return the sent data decoded from JSON."""
+        return [json.loads(data) for data in self.sent]
+
+    def __aiter__(self):
+        """Iterate over messages, or raise receive_error if set."""
+        if self.receive_error is not None:
+            raise self.receive_error
+        return self._iterate()
+
+    async def _iterate(self):
+        """Yield the queued messages."""
+        for message in self.messages:
+            yield message
+
 
 class TestHypeRateInitialization(unittest.TestCase):
     """Test HypeRate class initialization and configuration."""
@@ -65,19 +228,9 @@ class TestHypeRateInitialization(unittest.TestCase):
         """Test that all event handler lists are properly initialized."""
         client = HypeRate("test_token")
 
-        expected_events = [
-            "connected",
-            "disconnected",
-            "heartbeat",
-            "clip",
-            "channel_joined",
-            "channel_left",
-        ]
-
-        for event in expected_events:
-            self.assertIn(event, client._event_handlers)
-            self.assertIsInstance(client._event_handlers[event], list)
-            self.assertEqual(len(client._event_handlers[event]), 0)
+        self.assertEqual(set(client._event_handlers), _EXPECTED_EVENTS)
+        for event in _EXPECTED_EVENTS:
+            self.assertEqual(client._event_handlers[event], [])
 
     def test_logger_setup_without_custom_logger(self):
         """Test that logger is properly set up when no custom logger is provided."""
@@ -91,9 +244,17 @@ class TestHypeRateInitialization(unittest.TestCase):
 class TestHypeRateEventHandling(unittest.TestCase):
     """Test event registration and firing mechanisms."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Create one client shared by every test in the class."""
+        cls.client = HypeRate("test_token", logger=_CAPTURE_LOGGER)
+
     def setUp(self):
         """Set up test fixtures."""
-        self.client = HypeRate("test_token")
+        # Handlers are the only state these tests change on the client
+        for handlers in self.client._event_handlers.values():
+            handlers.clear()
+        _LOG.records.clear()
         self.mock_handler1 = Mock()
         self.mock_handler2 = Mock()
 
@@ -116,9 +277,8 @@ class TestHypeRateEventHandling(unittest.TestCase):
 
     def test_register_invalid_event_handler(self):
         """Test registering handler for invalid event logs warning."""
-        with patch.object(self.client.logger, "warning") as mock_warning:
-            self.client.on("invalid_event", self.mock_handler1)
-            mock_warning.assert_called_once()
+        self.client.on("invalid_event", self.mock_handler1)
+        self.assertEqual(len(_LOG.messages(logging.WARNING)), 1)
 
     def test_fire_event_with_handlers(self):
         """Test firing events with registered handlers."""
@@ -133,11 +293,10 @@ class TestHypeRateEventHandling(unittest.TestCase):
 
     def test_fire_event_without_handlers(self):
         """Test firing events with no registered handlers."""
-        with patch.object(self.client.logger, "debug") as mock_debug:
-            self.client._fire_event("heartbeat", {"hr": 75})
-            mock_debug.assert_any_call(
-                "No handlers registered for event: %s", "heartbeat"
-            )
+        self.client._fire_event("heartbeat", {"hr": 75})
+        self.assertIn(
+            "No handlers registered for event: heartbeat", _LOG.messages(logging.DEBUG)
+        )
 
     def test_fire_event_with_handler_exception(self):
         """Test firing events when a handler raises an exception."""
@@ -148,12 +307,11 @@ class TestHypeRateEventHandling(unittest.TestCase):
         self.client.on("heartbeat", failing_handler)
         self.client.on("heartbeat", self.mock_handler1)
 
-        with patch.object(self.client.logger, "error") as mock_error:
-            self.client._fire_event("heartbeat", {"hr": 75})
+        self.client._fire_event("heartbeat", {"hr": 75})
 
-            # Should log error but still call other handlers
-            mock_error.assert_called_once()
-            self.mock_handler1.assert_called_once_with({"hr": 75})
+        # Should log error but still call other handlers
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
+        self.mock_handler1.assert_called_once_with({"hr": 75})
 
     def test_fire_event_with_multiple_arguments(self):
         """Test firing events with multiple arguments."""
@@ -164,13 +322,15 @@ class TestHypeRateEventHandling(unittest.TestCase):
         self.mock_handler1.assert_called_once_with("test_channel", "extra_arg")
 
 
-class TestHypeRateConnection(unittest.IsolatedAsyncioTestCase):
+@pytest.mark.asyncio(loop_scope="module")
+class TestHypeRateConnection:
     """Test WebSocket connection functionality."""
 
-    def setUp(self):
-        """Set up test fixtures."""
+    @pytest_asyncio.fixture(autouse=True, loop_scope="module")
+    async def setup_client(self):
+        """Set up test fixtures on the shared module event loop."""
         self.client = HypeRate("test_token")
-        self.mock_ws = AsyncMock()
+        self.mock_ws = _FakeWS()
 
     async def test_successful_connection(self):
         """Test successful WebSocket connection."""
@@ -183,75 +343,76 @@ class TestHypeRateConnection(unittest.IsolatedAsyncioTestCase):
         mock_receive_task = Mock()
         mock_heartbeat_task = Mock()
 
-        with patch(
-            "websockets.connect", side_effect=mock_connect
-        ) as mock_connect_patch:
-            with patch.object(self.client, "_fire_event") as mock_fire:
-                # Completely bypass the task creation by mocking create_task
-                with patch.object(
+        with ExitStack() as stack:
+            mock_connect_patch = stack.enter_context(
+                patch(_CONNECT_TARGET, side_effect=mock_connect)
+            )
+            mock_fire = stack.enter_context(patch.object(self.client, "_fire_event"))
+            # Completely bypass the task creation by mocking create_task
+            mock_create_task = stack.enter_context(
+                patch.object(
                     self.client._loop,
                     "create_task",
                     side_effect=[mock_receive_task, mock_heartbeat_task],
-                ) as mock_create_task:
-                    # Mock the coroutine functions themselves to return None immediately
-                    with patch.object(self.client, "_receive", return_value=None):
-                        with patch.object(self.client, "_heartbeat", return_value=None):
-
-                            await self.client.connect()
-
-                            mock_connect_patch.assert_called_once_with(
-                                "wss://app.hyperate.io/socket/websocket?token=test_token"
-                            )
-                            self.assertEqual(self.client.ws, mock_ws)
-                            self.assertTrue(self.client.connected)
-                            mock_fire.assert_called_once_with("connected")
-                            self.assertEqual(
-                                mock_create_task.call_count, 2
-                            )  # receive and heartbeat tasks
-                            self.assertEqual(
-                                self.client._receive_task, mock_receive_task
-                            )
-                            self.assertEqual(
-                                self.client._heartbeat_task, mock_heartbeat_task
-                            )
+                )
+            )
+            # Mock the coroutine functions themselves to return None immediately
+            stack.enter_context(
+                patch.object(self.client, "_receive", return_value=None)
+            )
+            stack.enter_context(
+                patch.object(self.client, "_heartbeat", return_value=None)
+            )
+
+            await self.client.connect()
+
+            mock_connect_patch.assert_called_once_with(
+                "wss://app.hyperate.io/socket/websocket?token=test_token"
+            )
+            assert self.client.ws == mock_ws
+            assert self.client.connected
+            mock_fire.assert_called_once_with("connected")
+            # receive and heartbeat tasks
+            assert mock_create_task.call_count == 2
+            assert self.client._receive_task == mock_receive_task
+            assert self.client._heartbeat_task == mock_heartbeat_task
 
     async def test_connection_failure_websocket_exception(self):
         """Test connection failure with WebSocket exception."""
         with patch(
-            "websockets.connect", side_effect=WebSocketException("Connection failed")
+            _CONNECT_TARGET, side_effect=WebSocketException("Connection failed")
         ):
             with pytest.raises(WebSocketException):
                 await self.client.connect()
 
-            self.assertIsNone(self.client.ws)
-            self.assertFalse(self.client.connected)
+            assert self.client.ws is None
+            assert not self.client.connected
 
     async def test_connection_failure_general_exception(self):
         """Test connection failure with general exception."""
-        with patch("websockets.connect", side_effect=Exception("General error")):
+        with patch(_CONNECT_TARGET, side_effect=Exception("General error")):
             with pytest.raises(Exception):
                 await self.client.connect()
 
-            self.assertIsNone(self.client.ws)
-            self.assertFalse(self.client.connected)
+            assert self.client.ws is None
+            assert not self.client.connected
 
     async def test_disconnect(self):
         """Test WebSocket disconnection."""
         # Set up connected state
         self.client.ws = self.mock_ws
         self.client.connected = True
-        self.client._receive_task = Mock()
-        self.client._receive_task.done.return_value = False
-        self.client._heartbeat_task = Mock()
-        self.client._heartbeat_task.done.return_value = False
+        loop = asyncio.get_running_loop()
+        self.client._receive_task = loop.create_future()
+        self.client._heartbeat_task = loop.create_future()
 
         with patch.object(self.client, "_fire_event") as mock_fire:
             await self.client.disconnect()
 
-            self.client._receive_task.cancel.assert_called_once()
-            self.client._heartbeat_task.cancel.assert_called_once()
-            self.mock_ws.close.assert_called_once()
-            self.assertFalse(self.client.connected)
+            assert self.client._receive_task.cancelled()
+            assert self.client._heartbeat_task.cancelled()
+            assert self.mock_ws.closed
+            assert not self.client.connected
             mock_fire.assert_called_once_with("disconnected")
 
     async def test_disconnect_with_completed_tasks(self):
@@ -259,17 +420,18 @@ class TestHypeRateConnection(unittest.IsolatedAsyncioTestCase):
         # Set up connected state with completed tasks
         self.client.ws = self.mock_ws
         self.client.connected = True
-        self.client._receive_task = Mock()
-        self.client._receive_task.done.return_value = True
-        self.client._heartbeat_task = Mock()
-        self.client._heartbeat_task.done.return_value = True
+        loop = asyncio.get_running_loop()
+        self.client._receive_task = loop.create_future()
+        self.client._receive_task.set_result(None)
+        self.client._heartbeat_task = loop.create_future()
+        self.client._heartbeat_task.set_result(None)
 
         await self.client.disconnect()
 
-        # Tasks should not be cancelled if already done
-        self.client._receive_task.cancel.assert_not_called()
-        self.client._heartbeat_task.cancel.assert_not_called()
-        self.mock_ws.close.assert_called_once()
+        # Cancelling a finished task is a no-op
+        assert not self.client._receive_task.cancelled()
+        assert not self.client._heartbeat_task.cancelled()
+        assert self.mock_ws.closed
 
     async def test_disconnect_without_websocket(self):
         """Test disconnection when no WebSocket connection exists."""
@@ -279,37 +441,46 @@ class TestHypeRateConnection(unittest.IsolatedAsyncioTestCase):
         with patch.object(self.client, "_fire_event") as mock_fire:
             await self.client.disconnect()
 
-            self.assertFalse(self.client.connected)
+            assert not self.client.connected
             mock_fire.assert_called_once_with("disconnected")
 
 
-class TestHypeRatePacketSending(unittest.IsolatedAsyncioTestCase):
-    """Test packet sending functionality."""
+@pytest_asyncio.fixture(loop_scope="module")
+async def packet_client():
+    """Provide a client wired to a fake WebSocket, created on the test's loop."""
+    client = HypeRate("test_token", logger=_CAPTURE_LOGGER)
+    client.ws = _FakeWS()
+    _LOG.records.clear()
+    yield client
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.client = HypeRate("test_token")
-        self.mock_ws = AsyncMock()
-        self.client.ws = self.mock_ws
 
-    async def test_send_packet_success(self):
+@pytest.mark.asyncio(loop_scope="module")
+class TestHypeRatePacketSending:
+    """Test packet sending functionality."""
+
+    async def test_send_packet_success(self, packet_client):
         """Test successful packet sending."""
         test_packet = {"topic": "test", "event": "test_event", "payload": {}}
 
-        await self.client.send_packet(test_packet)
+        await packet_client.send_packet(test_packet)
 
-        expected_json = json.dumps(test_packet)
-        self.mock_ws.send.assert_called_once_with(expected_json)
+        assert packet_client.ws.sent_parsed == [test_packet]
 
-    async def test_send_packet_websocket_exception(self):
+    async def test_send_packet_sends_text_frame(self, packet_client):
+        """Test packets are sent as str so they go out as text frames."""
+        await packet_client.send_packet({"topic": "test", "event": "test_event"})
+
+        assert isinstance(packet_client.ws.sent[0], str)
+
+    async def test_send_packet_websocket_exception(self, packet_client):
         """Test packet sending with WebSocket exception."""
-        self.mock_ws.send.side_effect = WebSocketException("Send failed")
+        packet_client.ws.send_error = WebSocketException("Send failed")
         test_packet = {"topic": "test", "event": "test_event"}
 
         with pytest.raises(WebSocketException):
-            await self.client.send_packet(test_packet)
+            await packet_client.send_packet(test_packet)
 
-    async def test_send_packet_json_error(self):
+    async def test_send_packet_json_error(self, packet_client):
         """Test packet sending with JSON encoding error."""
 
         # Create an object that can't be JSON serialized
@@ -319,33 +490,50 @@ class TestHypeRatePacketSending(unittest.IsolatedAsyncioTestCase):
         test_packet = {"data": NonSerializable()}
 
         with pytest.raises(TypeError):
-            await self.client.send_packet(test_packet)
+            await packet_client.send_packet(test_packet)
+
+    async def test_send_packets_in_order(self, packet_client):
+        """Test sending several packets keeps their order."""
+        packets = [{"topic": f"test{i}", "event": "join"} for i in range(3)]
 
-    async def test_send_packet_no_websocket(self):
+        await packet_client.send_packets(packets)
+
+        assert packet_client.ws.sent_parsed == packets
+
+    async def test_send_packets_stops_at_failure(self, packet_client):
+        """Test a failing packet aborts the rest of the batch."""
+        packet_client.ws.send_error = WebSocketException("Send failed")
+
+        with pytest.raises(WebSocketException):
+            await packet_client.send_packets([{"topic": "a"}, {"topic": "b"}])
+        assert len(_LOG.messages(logging.ERROR)) == 1
+
+    async def test_send_packet_no_websocket(self, packet_client):
         """Test packet sending when no WebSocket connection exists."""
-        self.client.ws = None
+        packet_client.ws = None
         test_packet = {"topic": "test"}
 
-        with patch.object(self.client.logger, "warning") as mock_warning:
-            await self.client.send_packet(test_packet)
-            mock_warning.assert_called_once_with(
-                "Attempted to send packet but WebSocket is not connected"
-            )
+        await packet_client.send_packet(test_packet)
+        assert _LOG.messages(logging.WARNING) == [
+            "Attempted to send packet but WebSocket is not connected"
+        ]
 
-    async def test_send_packet_general_exception(self):
+    async def test_send_packet_general_exception(self, packet_client):
         """Test packet sending with general exception."""
-        self.mock_ws.send.side_effect = Exception("General error")
+        packet_client.ws.send_error = Exception("General error")
         test_packet = {"topic": "test"}
 
         with pytest.raises(Exception):
-            await self.client.send_packet(test_packet)
+            await packet_client.send_packet(test_packet)
 
 
-class TestHypeRateChannelManagement(unittest.IsolatedAsyncioTestCase):
+@pytest.mark.asyncio(loop_scope="module")
+class TestHypeRateChannelManagement:
     """Test channel joining and leaving functionality."""
 
-    def setUp(self):
-        """Set up test fixtures."""
+    @pytest_asyncio.fixture(autouse=True, loop_scope="module")
+    async def setup_client(self):
+        """Set up test fixtures on the shared module event loop."""
         self.client = HypeRate("test_token")
 
     async def test_join_heartbeat_channel(self):
@@ -380,6 +568,19 @@ class TestHypeRateChannelManagement(unittest.IsolatedAsyncioTestCase):
             await self.client.leave_clips_channel(device_id)
             mock_leave.assert_called_once_with("clips:test_device")
 
+    async def test_join_and_leave_with_device(self):
+        """Test channel methods reuse the topics prebuilt on a Device."""
+        device = Device("test_device")
+
+        with patch.object(self.client, "join_channel") as mock_join, patch.object(
+            self.client, "leave_channel"
+        ) as mock_leave:
+            await self.client.join_heartbeat_channel(device)
+            await self.client.leave_clips_channel(device)
+
+        assert mock_join.call_args.args[0] is device.hr_topic
+        assert mock_leave.call_args.args[0] is device.clips_topic
+
     async def test_join_channel_success(self):
         """Test successful channel joining."""
         channel_name = "test_channel"
@@ -436,194 +637,217 @@ class TestHypeRateChannelManagement(unittest.IsolatedAsyncioTestCase):
 class TestHypeRateMessageHandling(unittest.TestCase):
     """Test WebSocket message handling and parsing."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Create one client shared by every test in the class."""
+        # Message handling doesn't touch the connection, so one client suffices
+        cls.client = HypeRate("test_token", logger=_CAPTURE_LOGGER)
+
     def setUp(self):
         """Set up test fixtures."""
-        self.client = HypeRate("test_token")
+        # A spy handler per event lets tests observe the real _fire_event path
+        self.spies = {}
+        for event, handlers in self.client._event_handlers.items():
+            handlers.clear()
+            self.spies[event] = Mock(name=event)
+            handlers.append(self.spies[event])
+        # Parse errors are rate limited per client; start each test unthrottled
+        self.client._last_parse_error_log = float("-inf")
+        self.client._suppressed_parse_errors = 0
+        _LOG.records.clear()
+
+    def assert_fired_once(self, event, *args):
+        """Assert that only the given event fired, once, with args."""
+        self.spies[event].assert_called_once_with(*args)
+        self.assert_not_fired(exclude=event)
+
+    def assert_not_fired(self, exclude=None):
+        """Assert that no event (other than exclude) fired."""
+        for event, spy in self.spies.items():
+            if event != exclude:
+                spy.assert_not_called()
 
     def test_handle_heartbeat_message_string(self):
         """Test handling heartbeat message as string."""
-        message_data = {"topic": "hr:test_device", "payload": {"hr": 75}}
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_called_once_with("heartbeat", {"hr": 75})
+        self.client._handle_message(_HEARTBEAT_MSG)
+        self.assert_fired_once("heartbeat", {"hr": 75})
 
     def test_handle_heartbeat_message_bytes(self):
         """Test handling heartbeat message as bytes."""
-        message_data = {"topic": "hr:test_device", "payload": {"hr": 80}}
-        message = json.dumps(message_data).encode("utf-8")
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_called_once_with("heartbeat", {"hr": 80})
+        self.client._handle_message(_HEARTBEAT_MSG_BYTES)
+        self.assert_fired_once("heartbeat", {"hr": 80})
 
     def test_handle_clip_message(self):
         """Test handling clip message."""
-        message_data = {
-            "topic": "clips:test_device",
-            "payload": {"twitch_slug": "test_clip_slug"},
-        }
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_called_once_with("clip", {"twitch_slug": "test_clip_slug"})
+        self.client._handle_message(_CLIP_MSG)
+        self.assert_fired_once("clip", {"twitch_slug": "test_clip_slug"})
 
     def test_handle_heartbeat_message_no_hr(self):
         """Test handling heartbeat message without hr field."""
-        message_data = {"topic": "hr:test_device", "payload": {"other_field": "value"}}
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_not_called()
+        self.client._handle_message(_HEARTBEAT_MSG_NO_HR)
+        self.assert_not_fired()
 
     def test_handle_clip_message_no_slug(self):
         """Test handling clip message without twitch_slug."""
-        message_data = {
-            "topic": "clips:test_device",
-            "payload": {"other_field": "value"},
-        }
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_not_called()
+        self.client._handle_message(_CLIP_MSG_NO_SLUG)
+        self.assert_not_fired()
 
     def test_handle_unknown_topic_message(self):
         """Test handling message with unknown topic."""
-        message_data = {
-            "topic": "unknown:test_device",
-            "event": "test_event",
-            "payload": {"data": "value"},
-        }
-        message = json.dumps(message_data)
+        self.client._handle_message(_UNKNOWN_TOPIC_MSG)
+        self.assert_not_fired()
+        self.assertIn(
+            "Received message for topic: unknown:test_device, event: test_event",
+            _LOG.messages(logging.DEBUG),
+        )
 
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            with patch.object(self.client.logger, "debug") as mock_debug:
-                self.client._handle_message(message)
-                mock_fire.assert_not_called()
-                mock_debug.assert_any_call(
-                    "Received message for topic: %s, event: %s",
-                    "unknown:test_device",
-                    "test_event",
-                )
+    def test_handle_topic_prefix_without_separator(self):
+        """Test a bare "hr" topic isn't treated as a heartbeat channel."""
+        self.client._handle_message(_HEARTBEAT_MSG_NO_SEPARATOR)
+        self.assert_not_fired()
 
     def test_handle_invalid_json_message(self):
         """Test handling invalid JSON message."""
         invalid_message = "invalid json {"
 
-        with patch.object(self.client.logger, "error") as mock_error:
-            self.client._handle_message(invalid_message)
-            mock_error.assert_called_once()
+        self.client._handle_message(invalid_message)
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
 
     def test_handle_invalid_bytes_message(self):
         """Test handling invalid bytes message."""
         invalid_bytes = b"\xff\xfe\\invalid"  # Fixed escape sequence
 
-        with patch.object(self.client.logger, "error") as mock_error:
-            self.client._handle_message(invalid_bytes)
-            mock_error.assert_called_once()
+        self.client._handle_message(invalid_bytes)
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
+
+    def test_handle_heartbeat_message_bytes_without_orjson(self):
+        """Test the stdlib JSON fallback when orjson is not installed."""
+        with patch("lib.hyperate.hyperate._json_loads", json.loads):
+            self.client._handle_message(_HEARTBEAT_MSG_BYTES)
+            self.assert_fired_once("heartbeat", {"hr": 80})
+
+    def test_handle_invalid_bytes_message_without_orjson(self):
+        """Test the stdlib JSON fallback rejects undecodable bytes."""
+        with patch("lib.hyperate.hyperate._json_loads", json.loads):
+            self.client._handle_message(b"\xff\xfe\\invalid")
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
+
+    def test_parse_errors_are_rate_limited(self):
+        """Test a burst of bad frames logs one error and counts the rest."""
+        with patch("lib.hyperate.hyperate.time.monotonic", return_value=100.0):
+            for _ in range(5):
+                self.client._handle_message("invalid json {")
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
+
+        with patch("lib.hyperate.hyperate.time.monotonic", return_value=101.0):
+            self.client._handle_message("invalid json {")
+        errors = _LOG.messages(logging.ERROR)
+        self.assertEqual(len(errors), 2)
+        self.assertIn("(4 similar errors suppressed)", errors[1])
+
+    def test_suppressed_parse_errors_flushed_after_burst(self):
+        """Test a burst that just stops still reports its suppressed count."""
+        with patch("lib.hyperate.hyperate.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                self.client._handle_message("invalid json {")
+            # Still inside the interval: nothing more is logged yet
+            self.client._handle_message(_HEARTBEAT_MSG_85)
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
+
+        with patch("lib.hyperate.hyperate.time.monotonic", return_value=101.0):
+            self.client._handle_message(_HEARTBEAT_MSG_85)
+            self.client._handle_message(_HEARTBEAT_MSG_85)
+        errors = _LOG.messages(logging.ERROR)
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(errors[1], "2 similar parse error(s) suppressed")
+
+    def test_suppressed_parse_errors_flushed_on_disconnect(self):
+        """Test disconnecting reports parse errors suppressed so far."""
+        with patch("lib.hyperate.hyperate.time.monotonic", return_value=100.0):
+            self.client._handle_message("invalid json {")
+            self.client._handle_message("invalid json {")
+        asyncio.run(self.client.disconnect())
+
+        errors = _LOG.messages(logging.ERROR)
+        self.assertEqual(errors[-1], "1 similar parse error(s) suppressed")
+        self.assertEqual(self.client._suppressed_parse_errors, 0)
 
     def test_handle_message_general_exception(self):
         """Test handling message with general exception."""
-        with patch("json.loads", side_effect=Exception("General error")):
-            with patch.object(self.client.logger, "error") as mock_error:
-                self.client._handle_message("test message")
-                mock_error.assert_called_once()
+        # Valid JSON that isn't an object fails on data.get(), past the parser
+        self.client._handle_message("[1, 2, 3]")
+        errors = [r for r in _LOG.records if r.levelno == logging.ERROR]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].msg, "Unexpected error handling message: %s")
+        self.assertIsInstance(errors[0].args[0], AttributeError)
 
     def test_handle_phoenix_reply_join_success(self):
         """Test handling Phoenix reply for successful channel join."""
-        message_data = {
-            "topic": "hr:test_device",
-            "event": "phx_reply",
-            "payload": {"status": "ok", "response": {}},
-            "ref": 1,
-        }
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_called_once_with("channel_joined", "test_device")
+        self.client._handle_message(_PHX_JOIN_OK)
+        self.assert_fired_once("channel_joined", "test_device")
 
     def test_handle_phoenix_reply_leave_success(self):
         """Test handling Phoenix reply for successful channel leave."""
-        message_data = {
-            "topic": "clips:test_device",
-            "event": "phx_reply",
-            "payload": {"status": "ok", "response": {}},
-            "ref": 2,
-        }
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            self.client._handle_message(message)
-            mock_fire.assert_called_once_with("channel_left", "test_device")
+        self.client._handle_message(_PHX_LEAVE_OK)
+        self.assert_fired_once("channel_left", "test_device")
 
     def test_handle_phoenix_reply_error(self):
         """Test handling Phoenix reply with error status."""
-        message_data = {
-            "topic": "hr:test_device",
-            "event": "phx_reply",
-            "payload": {"status": "error", "response": {"reason": "not_found"}},
-            "ref": 1,
-        }
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            with patch.object(self.client.logger, "error") as mock_error:
-                self.client._handle_message(message)
-                mock_fire.assert_not_called()  # Should not fire channel_joined on error
-                mock_error.assert_called_once()
+        self.client._handle_message(_PHX_JOIN_ERROR)
+        self.assert_not_fired()  # Should not fire channel_joined on error
+        self.assertEqual(len(_LOG.messages(logging.ERROR)), 1)
 
     def test_handle_phoenix_reply_unknown_ref(self):
         """Test handling Phoenix reply with unknown ref."""
-        message_data = {
-            "topic": "hr:test_device",
-            "event": "phx_reply",
-            "payload": {"status": "ok", "response": {}},
-            "ref": 999,  # Unknown ref
-        }
-        message = json.dumps(message_data)
-
-        with patch.object(self.client, "_fire_event") as mock_fire:
-            with patch.object(self.client.logger, "debug") as mock_debug:
-                self.client._handle_message(message)
-                mock_fire.assert_not_called()
-                mock_debug.assert_any_call(
-                    "Phoenix reply with status 'ok': %s", message_data
-                )
+        self.client._handle_message(_PHX_UNKNOWN_REF)
+        self.assert_not_fired()
+        self.assertIn(
+            f"Phoenix reply with status 'ok': {_PHX_UNKNOWN_REF_DATA}",
+            _LOG.messages(logging.DEBUG),
+        )
 
 
-class TestHypeRateBackgroundTasks(unittest.IsolatedAsyncioTestCase):
+@pytest.mark.asyncio(loop_scope="module")
+class TestHypeRateBackgroundTasks:
     """Test heartbeat and receive background tasks."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.client = HypeRate("test_token")
-        self.mock_ws = AsyncMock()
+    _MSGS = ("message1", "message2")
+
+    @pytest_asyncio.fixture(autouse=True, loop_scope="module")
+    async def setup_client(self):
+        """Set up test fixtures on the shared module event loop."""
+        self.client = HypeRate("test_token", logger=_CAPTURE_LOGGER)
+        self.mock_ws = _FakeWS()
         self.client.ws = self.mock_ws
+        _LOG.records.clear()
+
+        # Heartbeat waits are skipped so no test can block on the real interval
+        with patch(
+            "lib.hyperate.hyperate.asyncio.sleep", new=AsyncMock(return_value=None)
+        ) as mock_sleep:
+            self.mock_sleep = mock_sleep
+            yield
 
     async def test_heartbeat_task_normal_operation(self):
         """Test heartbeat task normal operation."""
         self.client.connected = True
 
-        # Mock sleep to prevent infinite loop
-        async def mock_sleep(duration):
+        async def send_once(packet):
             self.client.connected = False  # Stop after first iteration
 
-        with patch("asyncio.sleep", side_effect=mock_sleep):
-            with patch.object(self.client, "send_packet") as mock_send:
-                await self.client._heartbeat()
+        with patch.object(
+            self.client, "send_packet", side_effect=send_once
+        ) as mock_send:
+            await self.client._heartbeat()
 
-                expected_packet = {
-                    "topic": "phoenix",
-                    "event": "heartbeat",
-                    "payload": {},
-                    "ref": 0,
-                }
-                mock_send.assert_called_once_with(expected_packet)
+            expected_packet = {
+                "topic": "phoenix",
+                "event": "heartbeat",
+                "payload": {},
+                "ref": 0,
+            }
+            mock_send.assert_called_once_with(expected_packet)
+            self.mock_sleep.assert_awaited_once_with(10)
 
     async def test_heartbeat_task_cancelled_error(self):
         """Test heartbeat task with CancelledError."""
@@ -632,9 +856,8 @@ class TestHypeRateBackgroundTasks(unittest.IsolatedAsyncioTestCase):
         with patch.object(
             self.client, "send_packet", side_effect=asyncio.CancelledError()
         ):
-            with patch.object(self.client.logger, "debug") as mock_debug:
-                await self.client._heartbeat()
-                mock_debug.assert_any_call("Heartbeat task cancelled")
+            await self.client._heartbeat()
+        assert "Heartbeat task cancelled" in _LOG.messages(logging.DEBUG)
 
     async def test_heartbeat_task_websocket_exception(self):
         """Test heartbeat task with WebSocket exception."""
@@ -645,9 +868,8 @@ class TestHypeRateBackgroundTasks(unittest.IsolatedAsyncioTestCase):
             "send_packet",
             side_effect=WebSocketException("Heartbeat failed"),
         ):
-            with patch.object(self.client.logger, "error") as mock_error:
-                await self.client._heartbeat()
-                mock_error.assert_called_once()
+            await self.client._heartbeat()
+        assert len(_LOG.messages(logging.ERROR)) == 1
 
     async def test_heartbeat_task_general_exception(self):
         """Test heartbeat task with general exception."""
@@ -656,158 +878,223 @@ class TestHypeRateBackgroundTasks(unittest.IsolatedAsyncioTestCase):
         with patch.object(
             self.client, "send_packet", side_effect=Exception("General error")
         ):
-            with patch.object(self.client.logger, "error") as mock_error:
-                await self.client._heartbeat()
-                mock_error.assert_called_once()
+            await self.client._heartbeat()
+        assert len(_LOG.messages(logging.ERROR)) == 1
 
     async def test_receive_task_normal_operation(self):
         """Test receive task normal operation."""
-        messages = ["message1", "message2"]
-        self.mock_ws.__aiter__.return_value = iter(messages)
+        self.mock_ws.messages = self._MSGS
 
         with patch.object(self.client, "_handle_message") as mock_handle:
             await self.client._receive()
 
-            self.assertEqual(mock_handle.call_count, 2)
-            mock_handle.assert_has_calls([call("message1"), call("message2")])
+            assert mock_handle.call_count == len(self._MSGS)
+            mock_handle.assert_has_calls([call(message) for message in self._MSGS])
 
     async def test_receive_task_no_websocket(self):
         """Test receive task when WebSocket is None."""
         self.client.ws = None
 
-        with patch.object(self.client.logger, "debug") as mock_debug:
-            await self.client._receive()
-            mock_debug.assert_any_call("Receive task started")
-            mock_debug.assert_any_call("Receive task ended")
+        await self.client._receive()
+        assert "Receive task started" in _LOG.messages(logging.DEBUG)
+        assert "Receive task ended" in _LOG.messages(logging.DEBUG)
 
     async def test_receive_task_cancelled_error(self):
         """Test receive task with CancelledError."""
-        self.mock_ws.__aiter__.side_effect = asyncio.CancelledError()
+        self.mock_ws.receive_error = asyncio.CancelledError()
 
-        with patch.object(self.client.logger, "debug") as mock_debug:
-            await self.client._receive()
-            mock_debug.assert_any_call("Receive task cancelled")
+        await self.client._receive()
+        assert "Receive task cancelled" in _LOG.messages(logging.DEBUG)
 
     async def test_receive_task_connection_closed(self):
         """Test receive task with ConnectionClosed exception."""
-        self.mock_ws.__aiter__.side_effect = ConnectionClosed(None, None)
+        self.mock_ws.receive_error = ConnectionClosed(None, None)
 
         with patch.object(self.client, "_fire_event") as mock_fire:
             await self.client._receive()
 
-            self.assertFalse(self.client.connected)
+            assert not self.client.connected
             mock_fire.assert_called_once_with("disconnected")
 
     async def test_receive_task_websocket_exception(self):
         """Test receive task with WebSocket exception."""
-        self.mock_ws.__aiter__.side_effect = WebSocketException("Receive failed")
+        self.mock_ws.receive_error = WebSocketException("Receive failed")
 
         with patch.object(self.client, "_fire_event") as mock_fire:
             await self.client._receive()
 
-            self.assertFalse(self.client.connected)
+            assert not self.client.connected
             mock_fire.assert_called_once_with("disconnected")
 
     async def test_receive_task_general_exception(self):
         """Test receive task with general exception."""
-        self.mock_ws.__aiter__.side_effect = Exception("General error")
+        self.mock_ws.receive_error = Exception("General error")
 
         with patch.object(self.client, "_fire_event") as mock_fire:
             await self.client._receive()
 
-            self.assertFalse(self.client.connected)
+            assert not self.client.connected
             mock_fire.assert_called_once_with("disconnected")
 
 
-class TestDevice(unittest.TestCase):
-    """Test Device utility class."""
+# Device ID validation cases are parametrized so each one is its own test item
+@pytest.mark.parametrize("device_id", ["abc123", "DEF456", "a1b2c3", "123", "abcdefgh"])
+def test_valid_device_id_normal(device_id):
+    """Test validation of normal valid device IDs."""
+    assert Device.is_valid_device_id(device_id)
+
+
+@pytest.mark.parametrize("device_id", ["", "a", "ab"])
+def test_invalid_device_id_too_short(device_id):
+    """Test validation rejects device IDs that are too short."""
+    assert not Device.is_valid_device_id(device_id)
+
+
+@pytest.mark.parametrize("device_id", ["abcdefghi", "123456789", "toolongdeviceid"])
+def test_invalid_device_id_too_long(device_id):
+    """Test validation rejects device IDs that are too long."""
+    assert not Device.is_valid_device_id(device_id)
+
+
+@pytest.mark.parametrize(
+    "device_id",
+    ["abc-123", "def_456", "abc@123", "test.id", "test id", "abc123\n", "äbc123"],
+)
+def test_invalid_device_id_invalid_characters(device_id):
+    """Test validation rejects device IDs with invalid characters."""
+    assert not Device.is_valid_device_id(device_id)
+
+
+@pytest.mark.parametrize(
+    "input_str, expected",
+    [
+        ("abc123", "abc123"),
+        ("DEF456", "DEF456"),
+        ("test-id", "test-id"),  # Note: hyphen allowed in extraction, not validation
+    ],
+)
+def test_extract_device_id_from_raw_id(input_str, expected):
+    """Test extraction of device ID from raw device ID."""
+    assert Device.extract_device_id(input_str) == expected
+
+
+@pytest.mark.parametrize(
+    "input_str, expected",
+    [
+        ("https://app.hyperate.io/abc123", "abc123"),
+        ("http://app.hyperate.io/DEF456", "DEF456"),
+        ("app.hyperate.io/test123", "test123"),
+        ("https://app.hyperate.io/abc123?param=value", "abc123"),
+        ("http://app.hyperate.io/test-device?query=1&other=2", "test-device"),
+        ("https://app.hyperate.io/abc123#section", "abc123"),
+        ("https://app.hyperate.io/abc123/", "abc123"),
+    ],
+)
+def test_extract_device_id_from_url(input_str, expected):
+    """Test extraction of device ID from HypeRate URLs."""
+    assert Device.extract_device_id(input_str) == expected
+
+
+@pytest.mark.parametrize(
+    "input_str",
+    [
+        "",
+        "https://other-site.com/abc123",
+        "not-a-url-or-id",
+        "https://app.hyperate.io/",
+    ],
+)
+def test_extract_device_id_invalid_input(input_str):
+    """Test extraction doesn't crash on invalid input."""
+    # Some might still match the pattern, that's okay
+    assert Device.extract_device_id(input_str) in (None, input_str)
+
+
+@pytest.mark.parametrize("input_str", ["abc123\n", "abc-123\n", "abc123\n\n"])
+def test_extract_device_id_rejects_trailing_newline(input_str):
+    """Test a raw device ID followed by a newline is not extracted."""
+    # \Z, unlike $, doesn't match before a trailing newline
+    assert Device.extract_device_id(input_str) is None
+
+
+def test_extract_device_id_none_input():
+    """Test extraction rejects None with TypeError."""
+    with pytest.raises(TypeError):
+        Device.extract_device_id(None)
 
-    def test_valid_device_id_normal(self):
-        """Test validation of normal valid device IDs."""
-        valid_ids = ["abc123", "DEF456", "a1b2c3", "123", "abcdefgh"]
 
-        for device_id in valid_ids:
-            with self.subTest(device_id=device_id):
-                self.assertTrue(Device.is_valid_device_id(device_id))
+class TestDevice(unittest.TestCase):
+    """Test Device utility class."""
 
     def test_valid_device_id_internal_testing(self):
         """Test validation of special 'internal-testing' device ID."""
         self.assertTrue(Device.is_valid_device_id("internal-testing"))
 
-    def test_invalid_device_id_too_short(self):
-        """Test validation rejects device IDs that are too short."""
-        short_ids = ["", "a", "ab"]
-
-        for device_id in short_ids:
-            with self.subTest(device_id=device_id):
-                self.assertFalse(Device.is_valid_device_id(device_id))
-
-    def test_invalid_device_id_too_long(self):
-        """Test validation rejects device IDs that are too long."""
-        long_ids = ["abcdefghi", "123456789", "toolongdeviceid"]
-
-        for device_id in long_ids:
-            with self.subTest(device_id=device_id):
-                self.assertFalse(Device.is_valid_device_id(device_id))
-
-    def test_invalid_device_id_invalid_characters(self):
-        """Test validation rejects device IDs with invalid characters."""
-        invalid_ids = ["abc-123", "def_456", "abc@123", "test.id", "test id"]
-
-        for device_id in invalid_ids:
-            with self.subTest(device_id=device_id):
-                self.assertFalse(Device.is_valid_device_id(device_id))
-
-    def test_extract_device_id_from_raw_id(self):
-        """Test extraction of device ID from raw device ID."""
-        test_cases = [
-            ("abc123", "abc123"),
-            ("DEF456", "DEF456"),
-            (
-                "test-id",
-                "test-id",
-            ),  # Note: hyphen allowed in extraction, not validation
-        ]
+    def test_device_instance_topics(self):
+        """Test a Device instance prebuilds its channel topics."""
+        device = Device("abc123")
+
+        self.assertEqual(device.device_id, "abc123")
+        self.assertEqual(device.hr_topic, "hr:abc123")
+        self.assertEqual(device.clips_topic, "clips:abc123")
+        self.assertFalse(hasattr(device, "__dict__"))
+
+    def test_device_without_id(self):
+        """Test Device() still works as a plain utility instance."""
+        device = Device()
+
+        self.assertTrue(device.is_valid_device_id("abc123"))
+        self.assertFalse(hasattr(device, "hr_topic"))
+        self.assertEqual(repr(device), "Device()")
+
+    def test_is_valid_device_id_agrees_with_regex(self):
+        """Test the string-method validator accepts exactly the regex alphabet."""
+        # Latin-1, a few Unicode digits/letters that str.isalnum() accepts
+        candidates = [chr(code) for code in range(0x100)] + ["²", "٣", "ß", "Ω"]
+        for char in candidates:
+            device_id = f"ab{char}"
+            self.assertEqual(
+                Device.is_valid_device_id(device_id),
+                Device.VALID_ID_REGEX.match(device_id) is not None,
+                msg=repr(device_id),
+            )
 
-        for input_str, expected in test_cases:
-            with self.subTest(input_str=input_str):
-                result = Device.extract_device_id(input_str)
-                self.assertEqual(result, expected)
-
-    def test_extract_device_id_from_url(self):
-        """Test extraction of device ID from HypeRate URLs."""
-        test_cases = [
-            ("https://app.hyperate.io/abc123", "abc123"),
-            ("http://app.hyperate.io/DEF456", "DEF456"),
-            ("app.hyperate.io/test123", "test123"),
-            ("https://app.hyperate.io/abc123?param=value", "abc123"),
-            ("http://app.hyperate.io/test-device?query=1&other=2", "test-device"),
-        ]
+    def test_extract_device_id_long_adversarial_input(self):
+        """Test extraction handles long, repetitive inputs without blowing up."""
+        # Neither the string fast path nor the regex fallback backtracks on
+        # these, so each finishes in linear time
+        self.assertIsNone(Device.extract_device_id("https://" * 50_000))
+        self.assertIsNone(Device.extract_device_id("a" * 200_000 + "!"))
+        self.assertEqual(
+            Device.extract_device_id("app.hyperate.io/" + "-" * 100_000 + "#"),
+            "-" * 100_000,
+        )
 
-        for input_str, expected in test_cases:
-            with self.subTest(input_str=input_str):
-                result = Device.extract_device_id(input_str)
-                self.assertEqual(result, expected)
+    def test_validate_batch_matches_single(self):
+        """Test batch validation agrees with is_valid_device_id."""
+        device_ids = ["abc123", "internal-testing", "ab", "abc-123", "", "abcdefgh"]
 
-    def test_extract_device_id_invalid_input(self):
-        """Test extraction returns None for invalid input."""
-        invalid_inputs = [
+        self.assertEqual(
+            Device.validate_batch(device_ids),
+            [Device.is_valid_device_id(device_id) for device_id in device_ids],
+        )
+        self.assertEqual(Device.validate_batch(iter([])), [])
+
+    def test_extract_batch_matches_single(self):
+        """Test batch extraction agrees with extract_device_id."""
+        inputs = [
+            "https://app.hyperate.io/abc123",
+            "http://app.hyperate.io/test-device?query=1",
+            "abc123",
             "",
             "https://other-site.com/abc123",
-            "not-a-url-or-id",
             "https://app.hyperate.io/",
-            None,  # This should not break the regex
         ]
 
-        for input_str in invalid_inputs:
-            with self.subTest(input_str=input_str):
-                if input_str is None:
-                    with self.assertRaises(TypeError):
-                        Device.extract_device_id(input_str)
-                else:
-                    result = Device.extract_device_id(input_str)
-                    # Some might still match the pattern, that's okay
-                    # The main thing is it shouldn't crash
+        self.assertEqual(
+            Device.extract_batch(inputs),
+            [Device.extract_device_id(input_str) for input_str in inputs],
+        )
 
     def test_regex_pattern_compilation(self):
         """Test that the regex pattern compiles correctly."""
@@ -819,6 +1106,7 @@ class TestDevice(unittest.TestCase):
         self.assertFalse(pattern.match("abc-123"))
         self.assertFalse(pattern.match(""))
         self.assertFalse(pattern.match("toolongdeviceid"))
+        self.assertFalse(pattern.match("abc123\n"))
 
 
 class TestHypeRateIntegration(unittest.IsolatedAsyncioTestCase):
@@ -842,18 +1130,14 @@ class TestHypeRateIntegration(unittest.IsolatedAsyncioTestCase):
         async def mock_connect(url):
             return mock_ws
 
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch(_CONNECT_TARGET, side_effect=mock_connect):
             await client.connect()
 
             self.assertTrue(client.connected)
             connected_handler.assert_called_once()
 
         # Test heartbeat message handling
-        heartbeat_message = json.dumps(
-            {"topic": "hr:testdevice", "payload": {"hr": 85}}
-        )
-
-        client._handle_message(heartbeat_message)
+        client._handle_message(_HEARTBEAT_MSG_85)
         heartbeat_handler.assert_called_once_with({"hr": 85})
 
         # Test disconnection
@@ -875,7 +1159,7 @@ class TestHypeRateIntegration(unittest.IsolatedAsyncioTestCase):
                 raise WebSocketException("Failed")
             return AsyncMock()
 
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch(_CONNECT_TARGET, side_effect=mock_connect):
             # First connection fails
             with pytest.raises(WebSocketException):
                 await client.connect()
@@ -893,8 +1177,8 @@ class TestHypeRateIntegration(unittest.IsolatedAsyncioTestCase):
     async def test_concurrent_operations(self):
         """Test concurrent operations on the client."""
         client = HypeRate("test_token")
-        mock_ws = AsyncMock()
-        client.ws = mock_ws
+        fake_ws = _FakeWS()
+        client.ws = fake_ws
 
         # Test concurrent packet sending
         packets = [
@@ -906,28 +1190,29 @@ class TestHypeRateIntegration(unittest.IsolatedAsyncioTestCase):
         tasks = [client.send_packet(packet) for packet in packets]
         await asyncio.gather(*tasks)
 
-        self.assertEqual(mock_ws.send.call_count, 3)
+        self.assertEqual(len(fake_ws.sent), 3)
 
     async def test_memory_cleanup_on_disconnect(self):
         """Test that resources are properly cleaned up on disconnect."""
         client = HypeRate("test_token")
-        mock_ws = AsyncMock()
+        fake_ws = _FakeWS()
+        loop = asyncio.get_running_loop()
+        receive_task = loop.create_future()
+        heartbeat_task = loop.create_future()
 
         # Set up connected state
-        client.ws = mock_ws
+        client.ws = fake_ws
         client.connected = True
-        client._receive_task = Mock()
-        client._receive_task.done.return_value = False
-        client._heartbeat_task = Mock()
-        client._heartbeat_task.done.return_value = False
+        client._receive_task = receive_task
+        client._heartbeat_task = heartbeat_task
 
         await client.disconnect()
 
         # Verify cleanup
         self.assertFalse(client.connected)
-        client._receive_task.cancel.assert_called_once()
-        client._heartbeat_task.cancel.assert_called_once()
-        mock_ws.close.assert_called_once()
+        self.assertTrue(receive_task.cancelled())
+        self.assertTrue(heartbeat_task.cancelled())
+        self.assertTrue(fake_ws.closed)
 
 
 class TestHypeRateLogging(unittest.TestCase):
@@ -983,8 +1268,7 @@ class TestHypeRateLogging(unittest.TestCase):
         client = HypeRate("test_token", logger=self.logger)
 
         # Test valid message
-        valid_message = json.dumps({"topic": "hr:test", "payload": {"hr": 75}})
-        client._handle_message(valid_message)
+        client._handle_message(_HEARTBEAT_MSG)
 
         # Test invalid message
         invalid_message = "invalid json"
@@ -1028,12 +1312,8 @@ class TestHypeRateEdgeCases(unittest.IsolatedAsyncioTestCase):
         """Test handling of Unicode characters in messages."""
         client = HypeRate("test_token")
 
-        unicode_message = json.dumps(
-            {"topic": "hr:test", "payload": {"hr": 75, "note": "???? ??"}}
-        )
-
         with patch.object(client, "_fire_event") as mock_fire:
-            client._handle_message(unicode_message)
+            client._handle_message(_UNICODE_MSG)
             mock_fire.assert_called_once()
 
     async def test_multiple_simultaneous_connections(self):
@@ -1052,7 +1332,7 @@ class TestHypeRateEdgeCases(unittest.IsolatedAsyncioTestCase):
             else:
                 return mock_ws2
 
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch(_CONNECT_TARGET, side_effect=mock_connect):
             # First connection
             await client.connect()
             self.assertEqual(client.ws, mock_ws1)
@@ -1082,39 +1362,38 @@ class TestHypeRateEdgeCases(unittest.IsolatedAsyncioTestCase):
         self.assertGreater(len(client._event_handlers["heartbeat"]), 1)
         self.assertNotIn(handler_that_removes_self, client._event_handlers["heartbeat"])
 
+    def test_event_handler_modification_uses_snapshot(self):
+        """Test firing reaches exactly the handlers registered when it started."""
+        client = HypeRate("test_token")
+        added_handler = Mock()
+        next_handler = Mock()
+
+        def handler_that_removes_self(*args):
+            client._event_handlers["heartbeat"].remove(handler_that_removes_self)
+            client.on("heartbeat", added_handler)
+
+        client.on("heartbeat", handler_that_removes_self)
+        client.on("heartbeat", next_handler)
+
+        client._fire_event("heartbeat", {"hr": 75})
+
+        # Removing itself must not skip the next handler, and a handler added
+        # mid-dispatch only sees later events
+        next_handler.assert_called_once_with({"hr": 75})
+        added_handler.assert_not_called()
+
     def test_large_message_handling(self):
         """Test handling of very large messages."""
         client = HypeRate("test_token")
 
-        # Create a large payload
-        large_payload = {"data": "x" * 100000, "hr": 75}
-        large_message = json.dumps({"topic": "hr:test", "payload": large_payload})
-
         with patch.object(client, "_fire_event") as mock_fire:
-            client._handle_message(large_message)
-            mock_fire.assert_called_once_with("heartbeat", large_payload)
+            client._handle_message(_LARGE_MSG)
+            mock_fire.assert_called_once_with("heartbeat", _LARGE_PAYLOAD)
 
     def test_nested_json_in_messages(self):
         """Test handling of deeply nested JSON structures."""
         client = HypeRate("test_token")
 
-        nested_payload = {
-            "hr": 75,
-            "metadata": {
-                "device": {
-                    "info": {
-                        "version": "1.0",
-                        "settings": {
-                            "enabled": True,
-                            "features": ["heartbeat", "clips"],
-                        },
-                    }
-                }
-            },
-        }
-
-        nested_message = json.dumps({"topic": "hr:test", "payload": nested_payload})
-
         with patch.object(client, "_fire_event") as mock_fire:
-            client._handle_message(nested_message)
-            mock_fire.assert_called_once_with("heartbeat", nested_payload)
+            client._handle_message(_NESTED_MSG)
+            mock_fire.assert_called_once_with("heartbeat", _NESTED_PAYLOAD)
@@ -4,29 +4,99 @@ Complex scenario tests for the HypeRate library.
 These tests simulate complex real-world usage scenarios using mocked connections
 to test the interaction between different components of the library without
 requiring actual network connections or API tokens.
+
+Clients and mocks live on a single test or test class, so the module has no
+module-level mutable state and can be spread across pytest-xdist workers:
+
+    python -m pytest Tests/test_mocked_scenarios.py -n auto
 """
 
-import asyncio
 import json
 import logging
-import time
 import unittest
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import lru_cache
+from itertools import count
+from time import perf_counter_ns
 from typing import Any, Dict, List
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
 from lib.hyperate import Device, HypeRate
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in the test requirements
+    orjson = None
+
+pytestmark = pytest.mark.integration
+
+# Both are pure functions of their input, so repeated table inputs are memoized
+_extract = lru_cache(maxsize=None)(Device.extract_device_id)
+_is_valid = lru_cache(maxsize=None)(Device.is_valid_device_id)
+
+if orjson is not None:
+
+    def _dumps(obj):
+        """Serialize obj to a JSON string with orjson."""
+        return orjson.dumps(obj).decode()
+
+    _dumpb = orjson.dumps
+
+else:
+    _dumps = json.dumps
+
+    def _dumpb(obj):
+        """Serialize obj to UTF-8 JSON bytes with the stdlib encoder."""
+        return json.dumps(obj).encode()
+
 
 class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
     """Test complex scenarios with mocked components."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Serialize the message fixtures once for the whole class."""
+        # Heartbeat streams are fed as bytes frames, which the client
+        # parses without decoding them to str first
+        cls.STREAM_HEARTBEATS = tuple(
+            _dumpb({"topic": "hr:streamer123", "payload": {"hr": hr}})
+            for hr in (75, 82, 78, 95, 88)  # 95 is a spike
+        )
+        cls.STREAM_CLIP = _dumps(
+            {
+                "topic": "clips:streamer123",
+                "payload": {"twitch_slug": "epic_moment_123"},
+            }
+        )
+        # Parallel tuples: MULTI_DEVICE_IDS[i] is the device that sent
+        # MULTI_DEVICE_MESSAGES[i], so handlers never re-parse the topic
+        cls.MULTI_DEVICE_IDS = ("device1", "device2", "device3", "device1", "device2")
+        cls.MULTI_DEVICE_MESSAGES = tuple(
+            _dumps({"topic": f"hr:{device_id}", "payload": {"hr": hr}})
+            for device_id, hr in zip(cls.MULTI_DEVICE_IDS, (75, 82, 68, 78, 85))
+        )
+        # 10,000 heartbeats varying between 70 and 100
+        cls.HIGH_FREQUENCY_HEARTBEATS = tuple(
+            _dumpb({"topic": "hr:athlete123", "payload": {"hr": 70 + (i % 30)}})
+            for i in range(10_000)
+        )
+        cls.ERROR_STREAM_HEARTBEATS = tuple(
+            _dumps({"topic": "hr:test", "payload": {"hr": hr}})
+            for hr in (75, 80, 85)
+        )
+
+    async def asyncSetUp(self):
+        """Create the mock WebSocket and connect function the tests share."""
+        self.mock_ws = AsyncMock()
+        self.mock_ws.close = AsyncMock()
+        self.mock_connect = AsyncMock(return_value=self.mock_ws)
+
     async def test_streaming_session_simulation(self):
         """Simulate a complete streaming session with heartbeat monitoring."""
         client = HypeRate("test_token")
-        mock_ws = AsyncMock()
-        mock_ws.close = AsyncMock()
 
         # Track received heartbeat data
         heartbeat_data: List[Dict[str, Any]] = []
@@ -51,12 +121,8 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
         client.on("clip", on_clip)
         client.on("disconnected", on_disconnected)
 
-        # Create an async function that returns the mock
-        async def mock_connect(*args, **kwargs):
-            return mock_ws
-
         # Simulate connection
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch("websockets.connect", self.mock_connect):
             await client.connect()
 
         # Simulate joining channels
@@ -64,25 +130,11 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
         await client.join_clips_channel("streamer123")
 
         # Simulate receiving heartbeat data over time
-        heartbeat_messages = [
-            {"topic": "hr:streamer123", "payload": {"hr": 75}},
-            {"topic": "hr:streamer123", "payload": {"hr": 82}},
-            {"topic": "hr:streamer123", "payload": {"hr": 78}},
-            {"topic": "hr:streamer123", "payload": {"hr": 95}},  # Spike!
-            {"topic": "hr:streamer123", "payload": {"hr": 88}},
-        ]
+        for raw in self.STREAM_HEARTBEATS:
+            client._handle_message(raw)
 
         # Simulate clip creation during high heart rate
-        clip_message = {
-            "topic": "clips:streamer123",
-            "payload": {"twitch_slug": "epic_moment_123"},
-        }
-
-        # Process messages
-        for msg in heartbeat_messages:
-            client._handle_message(json.dumps(msg))
-
-        client._handle_message(json.dumps(clip_message))
+        client._handle_message(self.STREAM_CLIP)
 
         # Verify data was captured
         self.assertEqual(len(connection_events), 1)
@@ -105,8 +157,6 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
     async def test_multi_device_monitoring(self):
         """Test monitoring multiple devices simultaneously."""
         client = HypeRate("test_token")
-        mock_ws = AsyncMock()
-        mock_ws.close = AsyncMock()
 
         # Track data per device
         device_data: Dict[str, List[int]] = {
@@ -115,20 +165,15 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
             "device3": [],
         }
 
+        # The test loop records which device sent the message being handled
+        current_device: ContextVar[str] = ContextVar("current_device")
+
         def on_heartbeat(payload):
-            # Extract device from current context or use a more sophisticated approach
-            # For this test, we'll track the last processed message's topic
-            if hasattr(client, "_last_topic"):
-                device_id = client._last_topic.split(":")[1]
-                if device_id in device_data:
-                    device_data[device_id].append(payload["hr"])
+            device_data[current_device.get()].append(payload["hr"])
 
         client.on("heartbeat", on_heartbeat)
 
-        async def mock_connect(*args, **kwargs):
-            return mock_ws
-
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch("websockets.connect", self.mock_connect):
             await client.connect()
 
         # Join multiple device channels
@@ -137,18 +182,9 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
             await client.join_heartbeat_channel(device)
 
         # Simulate messages from different devices
-        messages = [
-            {"topic": "hr:device1", "payload": {"hr": 75}},
-            {"topic": "hr:device2", "payload": {"hr": 82}},
-            {"topic": "hr:device3", "payload": {"hr": 68}},
-            {"topic": "hr:device1", "payload": {"hr": 78}},
-            {"topic": "hr:device2", "payload": {"hr": 85}},
-        ]
-
-        for msg in messages:
-            # Store the topic for the handler to access
-            client._last_topic = msg["topic"]
-            client._handle_message(json.dumps(msg))
+        for device_id, raw in zip(self.MULTI_DEVICE_IDS, self.MULTI_DEVICE_MESSAGES):
+            current_device.set(device_id)
+            client._handle_message(raw)
 
         # Verify each device received the correct data
         self.assertEqual(device_data["device1"], [75, 78])
@@ -159,14 +195,13 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
         """Test connection resilience and reconnection scenarios."""
         client = HypeRate("test_token")
         connection_attempts = []
+        attempt_numbers = count()
 
         async def track_connection(*args, **kwargs):
-            connection_attempts.append(time.time())
-            if len(connection_attempts) <= 2:
+            connection_attempts.append(perf_counter_ns())
+            if next(attempt_numbers) < 2:
                 raise ConnectionError("Connection failed")
-            mock_ws = AsyncMock()
-            mock_ws.close = AsyncMock()
-            return mock_ws
+            return self.mock_ws
 
         # Simulate multiple connection failures followed by success
         with patch("websockets.connect", side_effect=track_connection):
@@ -186,46 +221,28 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
     async def test_high_frequency_data_handling(self):
         """Test handling of high-frequency heartbeat data."""
         client = HypeRate("test_token")
-        received_count = 0
-
-        def count_heartbeats(payload):
-            nonlocal received_count
-            received_count += 1
-
-        client.on("heartbeat", count_heartbeats)
+        # A bound list.append keeps the handler itself out of the measurement
+        received = []
+        client.on("heartbeat", received.append)
 
-        # Simulate rapid heartbeat messages (1 per second simulation)
-        messages = []
-        base_hr = 70
-        for i in range(100):  # 100 heartbeats
-            hr = base_hr + (i % 30)  # Vary between 70-100
-            messages.append({"topic": "hr:athlete123", "payload": {"hr": hr}})
-
-        # Process all messages rapidly
-        start_time = time.time()
-        for msg in messages:
-            client._handle_message(json.dumps(msg))
-        end_time = time.time()
+        # Process all messages rapidly (1 per second simulation)
+        start_time = perf_counter_ns()
+        deque(map(client._handle_message, self.HIGH_FREQUENCY_HEARTBEATS), maxlen=0)
+        end_time = perf_counter_ns()
 
         # Verify all messages were processed
-        self.assertEqual(received_count, 100)
+        self.assertEqual(len(received), len(self.HIGH_FREQUENCY_HEARTBEATS))
 
         # Verify processing was reasonably fast (should be much less than 1s)
         processing_time = end_time - start_time
-        self.assertLess(processing_time, 1.0)
+        self.assertLess(processing_time, 1_000_000_000)
 
     async def test_error_handling_during_stream(self):
         """Test error handling during active streaming."""
         client = HypeRate("test_token")
-        mock_ws = AsyncMock()
-        mock_ws.close = AsyncMock()
 
         error_count = 0
-        successful_messages = 0
-
-        def track_success(payload):
-            nonlocal successful_messages
-            successful_messages += 1
+        successful_messages = count()
 
         def failing_handler(payload):
             nonlocal error_count
@@ -233,136 +250,126 @@ class TestMockedScenarios(unittest.IsolatedAsyncioTestCase):
             raise ValueError("Handler error")
 
         # Register both good and bad handlers
-        client.on("heartbeat", track_success)
+        client.on("heartbeat", lambda payload: next(successful_messages))
         client.on("heartbeat", failing_handler)
 
-        async def mock_connect(*args, **kwargs):
-            return mock_ws
-
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch("websockets.connect", self.mock_connect):
             await client.connect()
 
         # Send some messages
-        messages = [
-            {"topic": "hr:test", "payload": {"hr": 75}},
-            {"topic": "hr:test", "payload": {"hr": 80}},
-            {"topic": "hr:test", "payload": {"hr": 85}},
-        ]
-
-        for msg in messages:
-            client._handle_message(json.dumps(msg))
+        for raw in self.ERROR_STREAM_HEARTBEATS:
+            client._handle_message(raw)
 
         # Verify that despite errors, successful handler still worked
-        self.assertEqual(successful_messages, 3)
+        self.assertEqual(next(successful_messages), 3)
         self.assertEqual(error_count, 3)
 
-    async def test_device_validation_workflow(self):
-        """Test complete device ID validation and extraction workflow."""
-        test_cases = [
-            # (input, is_valid, expected_extracted)
-            ("abc123", True, "abc123"),
-            ("https://app.hyperate.io/def456", True, "def456"),
-            ("internal-testing", True, "internal-testing"),
-            ("toolong123", False, "toolong123"),  # Too long but extractable
-            ("", False, None),
-            (
-                "https://other-site.com/abc123",
-                False,
-                None,
-            ),  # Different domain - won't extract properly
-        ]
-
-        for input_str, should_be_valid, expected_extracted in test_cases:
-            with self.subTest(input_str=input_str):
-                # Test extraction
-                extracted = Device.extract_device_id(input_str) if input_str else None
-
-                if expected_extracted is not None:
-                    self.assertEqual(extracted, expected_extracted)
-                else:
-                    self.assertIsNone(extracted)
-
-                # Test validation on extracted ID
-                if extracted:
-                    is_valid = Device.is_valid_device_id(extracted)
-                    self.assertEqual(is_valid, should_be_valid)
+
+# Each workflow case is its own test item, so xdist can schedule them independently
+@pytest.mark.parametrize(
+    "input_str, should_be_valid, expected_extracted",
+    [
+        ("abc123", True, "abc123"),
+        ("https://app.hyperate.io/def456", True, "def456"),
+        ("internal-testing", True, "internal-testing"),
+        ("toolong123", False, "toolong123"),  # Too long but extractable
+        ("", False, None),
+        # Different domain - won't extract properly
+        ("https://other-site.com/abc123", False, None),
+    ],
+)
+def test_device_validation_workflow(input_str, should_be_valid, expected_extracted):
+    """Test complete device ID validation and extraction workflow."""
+    # Test extraction
+    extracted = _extract(input_str) if input_str else None
+
+    if expected_extracted is not None:
+        assert extracted == expected_extracted
+    else:
+        assert extracted is None
+
+    # Test validation on extracted ID
+    if extracted:
+        assert _is_valid(extracted) == should_be_valid
 
 
 class TestMockedPerformanceScenarios(unittest.IsolatedAsyncioTestCase):
     """Test performance-related scenarios with mocks."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Serialize the fixtures and create the shared client once."""
+        cls.CONCURRENT_HEARTBEATS = tuple(
+            _dumps({"topic": "hr:test", "payload": {"hr": 70 + i}})
+            for i in range(20)
+        )
+        # Progressively larger payloads
+        cls.LARGE_MESSAGES = tuple(
+            _dumps(
+                {"topic": "hr:test", "payload": {"hr": 75, "metadata": "x" * size}}
+            )
+            for size in (100, 1000, 10000, 100000)
+        )
+        # Shared by the tests that only feed messages to _handle_message;
+        # tests that connect still build their own client
+        cls.client = HypeRate("test_token")
+
+    def setUp(self):
+        """Start each test with no handlers on the shared client."""
+        for handlers in self.client._event_handlers.values():
+            handlers.clear()
+
     async def test_memory_usage_during_long_session(self):
         """Test memory usage doesn't grow excessively during long sessions."""
         client = HypeRate("test_token")
 
-        # Simulate a long session with many messages
-        initial_handlers = len(client._event_handlers["heartbeat"])
+        # Add and remove handlers repeatedly; one shared no-op handler keeps
+        # per-registration allocations out of the loop
+        def handler(payload):
+            pass
 
-        # Add and remove handlers repeatedly
         for i in range(1000):
-            handler = Mock()
             client.on("heartbeat", handler)
 
             if i % 10 == 0:  # Remove every 10th handler
                 client._event_handlers["heartbeat"].clear()
 
-        # Memory shouldn't grow indefinitely
+        # Only the registrations after the last clear (i = 991..999) remain
         final_handlers = len(client._event_handlers["heartbeat"])
-        self.assertLess(final_handlers, 100)  # Reasonable upper bound
+        self.assertEqual(final_handlers, 9)
 
-    async def test_concurrent_message_processing(self):
-        """Test concurrent message processing doesn't cause issues."""
-        client = HypeRate("test_token")
+    async def test_rapid_sequential_message_processing(self):
+        """Test rapid back-to-back message processing doesn't cause issues."""
+        client = self.client
         processed_messages = []
-        lock = asyncio.Lock()
-
-        async def async_handler(payload):
-            async with lock:
-                processed_messages.append(payload)
-                # Simulate some async processing
-                await asyncio.sleep(0.001)
-
-        # Note: The actual event firing is synchronous, but we can test
-        # that multiple messages can be processed without interference
-        messages = [{"topic": "hr:test", "payload": {"hr": 70 + i}} for i in range(20)]
-
-        # Process messages concurrently (simulate rapid arrival)
-        tasks = []
-        for msg in messages:
-            # We can't easily make the actual message handling async,
-            # but we can test that rapid sequential processing works
-            client._handle_message(json.dumps(msg))
-
-        # All messages should be processed
-        # (This test is more about ensuring no race conditions or crashes)
+        client.on("heartbeat", processed_messages.append)
+
+        # Event firing is synchronous, so rapid arrival is simulated by
+        # handling the messages back to back
+        deque(map(client._handle_message, self.CONCURRENT_HEARTBEATS), maxlen=0)
+
+        # Every message should reach the handler, in arrival order
         self.assertEqual(
-            len(processed_messages), 0
-        )  # Since handler isn't actually registered
+            [payload["hr"] for payload in processed_messages], list(range(70, 90))
+        )
 
     async def test_large_payload_handling(self):
         """Test handling of large payloads doesn't cause issues."""
-        client = HypeRate("test_token")
+        client = self.client
         large_payloads = []
 
         def handle_large_payload(payload):
-            large_payloads.append(len(json.dumps(payload)))
+            large_payloads.append(len(_dumps(payload)))
 
         client.on("heartbeat", handle_large_payload)
 
-        # Create progressively larger payloads
-        for size in [100, 1000, 10000, 100000]:
-            large_data = "x" * size
-            message = {
-                "topic": "hr:test",
-                "payload": {"hr": 75, "metadata": large_data},
-            }
-
-            start_time = time.time()
-            client._handle_message(json.dumps(message))
-            end_time = time.time()
+        for raw in self.LARGE_MESSAGES:
+            start_time = perf_counter_ns()
+            client._handle_message(raw)
+            end_time = perf_counter_ns()
 
-            # Processing should be reasonably fast even for large payloads
-            self.assertLess(end_time - start_time, 1.0)
+            # Processing should stay under 100 ms even for a 100 KB payload
+            self.assertLess(end_time - start_time, 100_000_000)
 
         # All payloads should have been processed
         self.assertEqual(len(large_payloads), 4)
@@ -377,6 +384,63 @@ class TestMockedPerformanceScenarios(unittest.IsolatedAsyncioTestCase):
 class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
     """Test edge cases with mocked components."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Serialize the message fixtures once for the whole class."""
+        # Server confirmations for joining (ref 1) and leaving (ref 2)
+        cls.JOIN_REPLY, cls.LEAVE_REPLY = (
+            _dumps(
+                {
+                    "topic": "test_channel",
+                    "event": "phx_reply",
+                    "payload": {"status": "ok", "response": {}},
+                    "ref": ref,
+                }
+            )
+            for ref in (1, 2)
+        )
+        # Expected handler calls are tallied while the messages are built
+        mixed = []
+        expected = Counter()
+        for i in range(50):
+            if i % 3 == 0:
+                mixed.append({"topic": "hr:test", "payload": {"hr": 75 + i % 20}})
+                expected["heartbeat"] += 1
+            elif i % 3 == 1:
+                mixed.append(
+                    {"topic": "clips:test", "payload": {"twitch_slug": f"clip_{i}"}}
+                )
+                expected["clip"] += 1
+            else:
+                mixed.append({"topic": "other:test", "payload": {"data": f"other_{i}"}})
+        cls.MIXED_MESSAGES = tuple(_dumps(msg) for msg in mixed)
+        cls.MIXED_HEARTBEAT_COUNT = expected["heartbeat"]
+        cls.MIXED_CLIP_COUNT = expected["clip"]
+        # Messages with various Unicode and special characters
+        cls.SPECIAL_MESSAGES = tuple(
+            _dumps(msg)
+            for msg in (
+                {"topic": "hr:test", "payload": {"hr": 75, "note": "test ünïcödé"}},
+                {
+                    "topic": "clips:emoji_device",
+                    "payload": {
+                        "twitch_slug": "amazing_clip_test",
+                        "description": "Emoji test 🔥❤️",
+                    },
+                },
+                {
+                    "topic": "hr:hebrew_device",
+                    "payload": {"hr": 80, "location": "Israel", "name": "עברית"},
+                },
+            )
+        )
+
+    async def asyncSetUp(self):
+        """Create the mock WebSocket and connect function the tests share."""
+        self.mock_ws = AsyncMock()
+        self.mock_ws.close = AsyncMock()
+        self.mock_connect = AsyncMock(return_value=self.mock_ws)
+
     async def test_rapid_connect_disconnect_cycles(self):
         """Test rapid connection and disconnection cycles."""
         client = HypeRate("test_token")
@@ -392,15 +456,8 @@ class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
         client.on("connected", track_connected)
         client.on("disconnected", track_disconnected)
 
-        # Create mock WebSocket
-        mock_ws = AsyncMock()
-        mock_ws.close = AsyncMock()
-
-        async def mock_connect(*args, **kwargs):
-            return mock_ws
-
         # Rapid connect/disconnect cycles
-        with patch("websockets.connect", side_effect=mock_connect):
+        with patch("websockets.connect", self.mock_connect):
             for i in range(5):
                 await client.connect()
                 await client.disconnect()
@@ -415,8 +472,7 @@ class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
     async def test_channel_management_edge_cases(self):
         """Test edge cases in channel management."""
         client = HypeRate("test_token")
-        mock_ws = AsyncMock()
-        client.ws = mock_ws
+        client.ws = self.mock_ws
 
         # Test joining and leaving the same channel multiple times
         channel_events = []
@@ -435,24 +491,12 @@ class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
             await client.join_channel("test_channel")
 
             # Simulate server confirmation for join
-            join_reply = {
-                "topic": "test_channel",
-                "event": "phx_reply",
-                "payload": {"status": "ok", "response": {}},
-                "ref": 1,
-            }
-            client._handle_message(json.dumps(join_reply))
+            client._handle_message(self.JOIN_REPLY)
 
             await client.leave_channel("test_channel")
 
             # Simulate server confirmation for leave
-            leave_reply = {
-                "topic": "test_channel",
-                "event": "phx_reply",
-                "payload": {"status": "ok", "response": {}},
-                "ref": 2,
-            }
-            client._handle_message(json.dumps(leave_reply))
+            client._handle_message(self.LEAVE_REPLY)
 
         # Should have tracked all operations
         self.assertEqual(len(channel_events), 6)
@@ -466,45 +510,18 @@ class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
         """Test rapid processing of mixed message types."""
         client = HypeRate("test_token")
 
-        heartbeat_count = 0
-        clip_count = 0
-        other_count = 0
-
-        def count_heartbeat(payload):
-            nonlocal heartbeat_count
-            heartbeat_count += 1
-
-        def count_clip(payload):
-            nonlocal clip_count
-            clip_count += 1
-
-        client.on("heartbeat", count_heartbeat)
-        client.on("clip", count_clip)
-
-        # Create mixed message types
-        messages = []
-        for i in range(50):
-            if i % 3 == 0:
-                messages.append({"topic": "hr:test", "payload": {"hr": 75 + i % 20}})
-            elif i % 3 == 1:
-                messages.append(
-                    {"topic": "clips:test", "payload": {"twitch_slug": f"clip_{i}"}}
-                )
-            else:
-                messages.append(
-                    {"topic": "other:test", "payload": {"data": f"other_{i}"}}
-                )
+        # next() on a count returns how many times it was advanced before
+        heartbeats = count()
+        clips = count()
+        client.on("heartbeat", lambda payload: next(heartbeats))
+        client.on("clip", lambda payload: next(clips))
 
         # Process all messages
-        for msg in messages:
-            client._handle_message(json.dumps(msg))
+        deque(map(client._handle_message, self.MIXED_MESSAGES), maxlen=0)
 
         # Verify counts
-        expected_heartbeat = len([m for m in messages if m["topic"].startswith("hr:")])
-        expected_clip = len([m for m in messages if m["topic"].startswith("clips:")])
-
-        self.assertEqual(heartbeat_count, expected_heartbeat)
-        self.assertEqual(clip_count, expected_clip)
+        self.assertEqual(next(heartbeats), self.MIXED_HEARTBEAT_COUNT)
+        self.assertEqual(next(clips), self.MIXED_CLIP_COUNT)
 
     async def test_unicode_and_special_characters_integration(self):
         """Test integration with Unicode and special characters."""
@@ -518,21 +535,8 @@ class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
         client.on("heartbeat", collect_data)
         client.on("clip", collect_data)
 
-        # Messages with various Unicode and special characters
-        special_messages = [
-            {"topic": "hr:test", "payload": {"hr": 75, "note": "test unicode"}},
-            {
-                "topic": "clips:emoji_device",
-                "payload": {
-                    "twitch_slug": "amazing_clip_test",
-                    "description": "Emoji test",
-                },
-            },
-            {"topic": "hr:hebrew_device", "payload": {"hr": 80, "location": "Israel"}},
-        ]
-
-        for msg in special_messages:
-            client._handle_message(json.dumps(msg, ensure_ascii=False))
+        for raw in self.SPECIAL_MESSAGES:
+            client._handle_message(raw)
 
         # All messages should be processed successfully
         self.assertEqual(len(received_data), 3)
@@ -541,14 +545,51 @@ class TestMockedEdgeCases(unittest.IsolatedAsyncioTestCase):
         self.assertIn("test", str(received_data[0]))
         self.assertIn("test", str(received_data[1]))
         self.assertIn("Israel", str(received_data[2]))
+        self.assertEqual(received_data[0]["note"], "test ünïcödé")
+        self.assertEqual(received_data[1]["description"], "Emoji test 🔥❤️")
+        self.assertEqual(received_data[2]["name"], "עברית")
 
 
 class TestMockedRegressionPrevention(unittest.IsolatedAsyncioTestCase):
     """Test scenarios that prevent regression of previously fixed bugs."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Serialize the fixtures and create the shared client once."""
+        # Messages with empty payloads or null values
+        cls.EMPTY_MESSAGES = tuple(
+            _dumps(msg)
+            for msg in (
+                {"topic": "hr:test", "payload": {}},
+                {"topic": "clips:test", "payload": {}},
+                {"topic": "hr:test", "payload": {"hr": None}},
+                {"topic": "clips:test", "payload": {"twitch_slug": None}},
+            )
+        )
+        # Messages with malformed topics, classified once as (raw, fires event)
+        cls.MALFORMED_MESSAGES = tuple(
+            (_dumps(msg), fires)
+            for msg, fires in (
+                ({"topic": "hr:", "payload": {"hr": 75}}, True),  # Empty device ID
+                ({"topic": "clips:", "payload": {"twitch_slug": "test"}}, True),
+                ({"topic": "hr", "payload": {"hr": 75}}, False),  # Missing colon
+                ({"topic": "", "payload": {"hr": 75}}, False),  # Empty topic
+                ({"payload": {"hr": 75}}, False),  # Missing topic entirely
+            )
+        )
+        cls.HEARTBEAT = _dumps({"topic": "hr:test", "payload": {"hr": 75}})
+        # Shared by the tests that only feed messages to _handle_message;
+        # tests that connect still build their own client
+        cls.client = HypeRate("test_token")
+
+    def setUp(self):
+        """Start each test with no handlers on the shared client."""
+        for handlers in self.client._event_handlers.values():
+            handlers.clear()
+
     async def test_empty_payload_handling(self):
         """Test handling of messages with empty payloads."""
-        client = HypeRate("test_token")
+        client = self.client
 
         events_fired = []
 
@@ -558,16 +599,7 @@ class TestMockedRegressionPrevention(unittest.IsolatedAsyncioTestCase):
         client.on("heartbeat", track_events)
         client.on("clip", track_events)
 
-        # Messages with empty payloads
-        empty_messages = [
-            {"topic": "hr:test", "payload": {}},
-            {"topic": "clips:test", "payload": {}},
-            {"topic": "hr:test", "payload": {"hr": None}},
-            {"topic": "clips:test", "payload": {"twitch_slug": None}},
-        ]
-
-        for msg in empty_messages:
-            client._handle_message(json.dumps(msg))
+        deque(map(client._handle_message, self.EMPTY_MESSAGES), maxlen=0)
 
         # Should handle gracefully - only messages with valid data should fire events
         # Empty payloads or null values should not fire events
@@ -575,7 +607,7 @@ class TestMockedRegressionPrevention(unittest.IsolatedAsyncioTestCase):
 
     async def test_malformed_topic_handling(self):
         """Test handling of messages with malformed topics."""
-        client = HypeRate("test_token")
+        client = self.client
 
         events_fired = []
 
@@ -585,23 +617,13 @@ class TestMockedRegressionPrevention(unittest.IsolatedAsyncioTestCase):
         client.on("heartbeat", track_events)
         client.on("clip", track_events)
 
-        # Messages with malformed topics - some should still trigger events
-        malformed_messages = [
-            {"topic": "hr:", "payload": {"hr": 75}},  # Empty device ID - should trigger
-            {
-                "topic": "clips:",
-                "payload": {"twitch_slug": "test"},
-            },  # Empty device ID - should trigger
-            {"topic": "hr", "payload": {"hr": 75}},  # Missing colon - won't trigger
-            {"topic": "", "payload": {"hr": 75}},  # Empty topic - won't trigger
-            {"payload": {"hr": 75}},  # Missing topic entirely - won't trigger
-        ]
-
-        for msg in malformed_messages:
+        for raw, fires in self.MALFORMED_MESSAGES:
+            fired_before = len(events_fired)
             try:
-                client._handle_message(json.dumps(msg))
+                client._handle_message(raw)
             except Exception:
                 pass  # Should handle gracefully, not crash
+            self.assertEqual(len(events_fired) - fired_before, int(fires), raw)
 
         # First two malformed messages should still fire events as they have valid topic prefixes
         self.assertEqual(len(events_fired), 2)
@@ -621,7 +643,7 @@ class TestMockedRegressionPrevention(unittest.IsolatedAsyncioTestCase):
 
     async def test_handler_exception_isolation(self):
         """Test that exceptions in one handler don't affect others."""
-        client = HypeRate("test_token")
+        client = self.client
 
         results = []
 
@@ -641,8 +663,7 @@ class TestMockedRegressionPrevention(unittest.IsolatedAsyncioTestCase):
         client.on("heartbeat", good_handler2)
 
         # Fire event
-        message = {"topic": "hr:test", "payload": {"hr": 75}}
-        client._handle_message(json.dumps(message))
+        client._handle_message(self.HEARTBEAT)
 
         # All handlers should have been called despite the exception
         self.assertIn("good1", results)
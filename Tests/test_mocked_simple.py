@@ -18,6 +18,8 @@ import pytest
 
 from lib.hyperate import Device, HypeRate
 
+pytestmark = pytest.mark.integration
+
 
 class TestSimpleMockedScenarios(unittest.IsolatedAsyncioTestCase):
     """Test simple scenarios with mocked components."""
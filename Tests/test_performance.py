@@ -21,6 +21,8 @@ import pytest
 
 from lib.hyperate import Device, HypeRate
 
+pytestmark = pytest.mark.performance
+
 # Import token management from conftest
 try:
     from conftest import get_api_token
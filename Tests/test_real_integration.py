@@ -23,6 +23,8 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from lib.hyperate import Device, HypeRate
 
+pytestmark = pytest.mark.real_integration
+
 # Import token management from conftest
 try:
     from conftest import get_api_token, set_api_token
@@ -10,11 +10,17 @@ import json
 import logging
 import re
 import sys
+import time
 import warnings
-from typing import Any, Callable, Dict, List, Optional, Pattern, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Union
 
 import websockets
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None  # type: ignore[assignment]
+
 # Check Python version early but after imports
 if sys.version_info < (3, 8):
     raise ImportError(
@@ -30,6 +36,44 @@ WebSocketConnection = Any  # websockets.WebSocketClientProtocol or similar
 RegexPattern = Pattern[str]
 
 
+def _orjson_dumps(obj: Any) -> str:
+    """Encode obj as compact JSON text with orjson."""
+    # Decoded to str so packets still go out as text frames
+    return orjson.dumps(obj).decode()  # pylint: disable=no-member
+
+
+# Event names a handler can be registered for. Identifier-like string literals
+# are interned by CPython, so these keys and the literals passed to
+# _fire_event() are the same objects and dict lookups match on identity.
+_EVENTS = (
+    "connected",
+    "disconnected",
+    "heartbeat",
+    "clip",
+    "channel_joined",
+    "channel_left",
+)
+
+
+# At most one "Failed to parse message" error is logged per interval (seconds),
+# so a server sending bad frames can't flood the log
+_PARSE_ERROR_LOG_INTERVAL = 1.0
+
+
+# JSON codec, chosen once at import. Both parsers accept str and UTF-8 bytes,
+# so incoming frames are parsed without a separate decode step.
+_json_loads: Callable[[Union[str, bytes]], Any] = (
+    orjson.loads  # pylint: disable=no-member
+    if orjson is not None
+    else json.loads
+)
+_json_dumps: Callable[[Any], str] = (
+    _orjson_dumps
+    if orjson is not None
+    else json.JSONEncoder(separators=(",", ":")).encode
+)
+
+
 # pylint: disable=too-many-instance-attributes
 class HypeRate:
     """
@@ -70,13 +114,15 @@ class HypeRate:
         self.ws: Optional[WebSocketConnection] = None
         self.connected: bool = False
         self._event_handlers: Dict[str, List[Callable[..., None]]] = {
-            "connected": [],
-            "disconnected": [],
-            "heartbeat": [],
-            "clip": [],
-            "channel_joined": [],
-            "channel_left": [],
+            event: [] for event in _EVENTS
         }
+        # Data message handlers keyed by topic prefix ("hr:<id>", "clips:<id>")
+        self._topic_handlers: Dict[str, Callable[[str, Dict[str, Any]], None]] = {
+            "hr": self._handle_heartbeat_message,
+            "clips": self._handle_clip_message,
+        }
+        self._last_parse_error_log: float = float("-inf")
+        self._suppressed_parse_errors: int = 0
         self._receive_task: Optional[asyncio.Task[None]] = None
         self._heartbeat_task: Optional[asyncio.Task[None]] = None
 
@@ -176,8 +222,9 @@ class HypeRate:
         """
         self.logger.info("Disconnecting from HypeRate WebSocket")
 
-        if self._receive_task and not self._receive_task.done():
-            self._receive_task.cancel()
+        # cancel() is a no-op returning False on a finished task, so it
+        # doubles as the done() check
+        if self._receive_task is not None and self._receive_task.cancel():
             # Await the cancellation to prevent warnings about unawaited coroutines
             # Only if it's an actual asyncio.Task
             if hasattr(self._receive_task, "__await__"):
@@ -187,8 +234,7 @@ class HypeRate:
                     pass
             self.logger.debug("Receive task cancelled")
 
-        if self._heartbeat_task and not self._heartbeat_task.done():
-            self._heartbeat_task.cancel()
+        if self._heartbeat_task is not None and self._heartbeat_task.cancel():
             # Await the cancellation to prevent warnings about unawaited coroutines
             # Only if it's an actual asyncio.Task
             if hasattr(self._heartbeat_task, "__await__"):
@@ -198,6 +244,9 @@ class HypeRate:
                     pass
             self.logger.debug("Heartbeat task cancelled")
 
+        if self._suppressed_parse_errors:
+            self._flush_parse_errors()
+
         if self.ws:
             await self.ws.close()
             self.logger.debug("WebSocket connection closed")
@@ -215,7 +264,7 @@ class HypeRate:
         """
         if self.ws:
             try:
-                json_data = json.dumps(packet)
+                json_data = _json_dumps(packet)
                 await self.ws.send(json_data)
                 self.logger.debug("Sent packet: %s", packet)
             except websockets.exceptions.WebSocketException as e:
@@ -236,47 +285,80 @@ class HypeRate:
                 "Attempted to send packet but WebSocket is not connected"
             )
 
-    async def join_heartbeat_channel(self, device_id: str) -> None:
+    async def send_packets(self, packets: Iterable[Dict[str, Any]]) -> None:
+        """
+        Send several packets to the WebSocket server, in order.
+
+        Packets are sent one after another from this coroutine, so no task is
+        created per packet. Sending stops at the first packet that fails.
+
+        Args:
+            packets (Iterable[dict]): The packets to send, each JSON-encoded.
+        """
+        for packet in packets:
+            await self.send_packet(packet)
+
+    async def join_heartbeat_channel(self, device_id: Union[str, "Device"]) -> None:
         """
         Subscribe to heartbeat data for a specific device.
 
         Args:
-            device_id (str): The device ID to subscribe to for heartbeat data.
+            device_id (str | Device): The device ID, or a Device, to subscribe to
+                for heartbeat data.
         """
-        channel_name = f"hr:{device_id}"
+        if isinstance(device_id, Device):
+            channel_name = device_id.hr_topic
+            device_id = device_id.device_id
+        else:
+            channel_name = f"hr:{device_id}"
         self.logger.info("Joining heartbeat channel for device: %s", device_id)
         await self.join_channel(channel_name)
 
-    async def leave_heartbeat_channel(self, device_id: str) -> None:
+    async def leave_heartbeat_channel(self, device_id: Union[str, "Device"]) -> None:
         """
         Unsubscribe from heartbeat data for a specific device.
 
         Args:
-            device_id (str): The device ID to unsubscribe from for heartbeat data.
+            device_id (str | Device): The device ID, or a Device, to unsubscribe from
+                for heartbeat data.
         """
-        channel_name = f"hr:{device_id}"
+        if isinstance(device_id, Device):
+            channel_name = device_id.hr_topic
+            device_id = device_id.device_id
+        else:
+            channel_name = f"hr:{device_id}"
         self.logger.info("Leaving heartbeat channel for device: %s", device_id)
         await self.leave_channel(channel_name)
 
-    async def join_clips_channel(self, device_id: str) -> None:
+    async def join_clips_channel(self, device_id: Union[str, "Device"]) -> None:
         """
         Subscribe to clip data for a specific device.
 
         Args:
-            device_id (str): The device ID to subscribe to for clip data.
+            device_id (str | Device): The device ID, or a Device, to subscribe to
+                for clip data.
         """
-        channel_name = f"clips:{device_id}"
+        if isinstance(device_id, Device):
+            channel_name = device_id.clips_topic
+            device_id = device_id.device_id
+        else:
+            channel_name = f"clips:{device_id}"
         self.logger.info("Joining clips channel for device: %s", device_id)
         await self.join_channel(channel_name)
 
-    async def leave_clips_channel(self, device_id: str) -> None:
+    async def leave_clips_channel(self, device_id: Union[str, "Device"]) -> None:
         """
         Unsubscribe from clip data for a specific device.
 
         Args:
-            device_id (str): The device ID to unsubscribe from for clip data.
+            device_id (str | Device): The device ID, or a Device, to unsubscribe from
+                for clip data.
         """
-        channel_name = f"clips:{device_id}"
+        if isinstance(device_id, Device):
+            channel_name = device_id.clips_topic
+            device_id = device_id.device_id
+        else:
+            channel_name = f"clips:{device_id}"
         self.logger.info("Leaving clips channel for device: %s", device_id)
         await self.leave_channel(channel_name)
 
@@ -378,9 +460,14 @@ class HypeRate:
         self.logger.debug("Receive task started")
         try:
             if self.ws is not None:
+                # Bursts of frames come straight from the connection's buffer,
+                # so keep the per-message Python work down
+                handle_message = self._handle_message
+                logger = self.logger
                 async for message in self.ws:
-                    self.logger.debug("Received message: %s", message)
-                    self._handle_message(message)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Received message: %s", message)
+                    handle_message(message)
         except asyncio.CancelledError:
             self.logger.debug("Receive task cancelled")
         except websockets.exceptions.ConnectionClosed as e:
@@ -411,39 +498,83 @@ class HypeRate:
             message: The raw WebSocket message to process.
         """
         try:
-            # Convert bytes to string if necessary
-            message_str = (
-                message if isinstance(message, str) else message.decode("utf-8")
-            )
-            data = json.loads(message_str)
+            data = _json_loads(message)
+
+            # Report errors suppressed by a burst of bad frames that has ended
+            if self._suppressed_parse_errors and (
+                time.monotonic() - self._last_parse_error_log
+                >= _PARSE_ERROR_LOG_INTERVAL
+            ):
+                self._flush_parse_errors()
+
             topic = data.get("topic", "")
             event = data.get("event", "")
             payload = data.get("payload", {})
             ref = data.get("ref")
 
-            # Log all messages for debugging (but not too verbose in production)
-            self.logger.debug(
-                "Received message: topic=%s, event=%s, ref=%s", topic, event, ref
-            )
+            # Log all messages for debugging (but not too verbose in production).
+            # Guarded since this runs per message and DEBUG is usually off.
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Received message: topic=%s, event=%s, ref=%s", topic, event, ref
+                )
 
             # Handle different message types
             if event == "phx_reply":
                 self._handle_phoenix_reply(topic, payload, ref, data)
-            elif topic.startswith("hr:"):
-                self._handle_heartbeat_message(topic, payload)
-            elif topic.startswith("clips:"):
-                self._handle_clip_message(topic, payload)
+                return
+
+            prefix, separator, _ = topic.partition(":")
+            handler = self._topic_handlers.get(prefix) if separator else None
+            if handler is not None:
+                handler(topic, payload)
             else:
                 self.logger.debug(
                     "Received message for topic: %s, event: %s", topic, event
                 )
 
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
         except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            self.logger.error("Failed to parse message: %s", e)
+            self._log_parse_error(e)
         # Keep broad exception catching for robustness in message handling
         except Exception as e:  # pylint: disable=broad-exception-caught
             self.logger.error("Unexpected error handling message: %s", e)
 
+    def _log_parse_error(self, error: ValueError) -> None:
+        """
+        Log a message parse error, rate limited to one per interval.
+
+        Errors within _PARSE_ERROR_LOG_INTERVAL of the last logged one are
+        only counted. The count is reported with the next logged error, or by
+        _flush_parse_errors once the burst ends.
+
+        Args:
+            error: The JSON or Unicode decoding error.
+        """
+        now = time.monotonic()
+        if now - self._last_parse_error_log < _PARSE_ERROR_LOG_INTERVAL:
+            self._suppressed_parse_errors += 1
+            return
+
+        if self._suppressed_parse_errors:
+            self.logger.error(
+                "Failed to parse message: %s (%d similar errors suppressed)",
+                error,
+                self._suppressed_parse_errors,
+            )
+        else:
+            self.logger.error("Failed to parse message: %s", error)
+        self._last_parse_error_log = now
+        self._suppressed_parse_errors = 0
+
+    def _flush_parse_errors(self) -> None:
+        """Log and reset the count of parse errors suppressed so far."""
+        self.logger.error(
+            "%d similar parse error(s) suppressed",
+            self._suppressed_parse_errors,
+        )
+        self._suppressed_parse_errors = 0
+
     def _handle_phoenix_reply(
         self,
         topic: str,
@@ -536,10 +667,13 @@ class HypeRate:
         """
         handlers = self._event_handlers.get(event, [])
         if handlers:
-            self.logger.debug(
-                "Firing event '%s' to %d handler(s)", event, len(handlers)
-            )
-            for handler in handlers:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Firing event '%s' to %d handler(s)", event, len(handlers)
+                )
+            # Iterate a snapshot so handlers that add or remove handlers
+            # don't change which ones this event reaches
+            for handler in tuple(handlers):
                 try:
                     handler(*args)
                 # Keep broad exception catching to prevent one bad handler
@@ -552,10 +686,47 @@ class HypeRate:
 
 class Device:
     """
-    Utility class for validating and extracting device IDs used in the HypeRate system.
+    A HypeRate device, plus utilities for validating and extracting device IDs.
+
+    Instances created with a device ID hold it with its heartbeat and clips
+    channel topics, built once so repeated joins and leaves reuse the same
+    strings. Device() without an ID only gives access to the static utilities.
+
+    Attributes:
+        device_id (str): The device ID.
+        hr_topic (str): The heartbeat channel topic, "hr:<device_id>".
+        clips_topic (str): The clips channel topic, "clips:<device_id>".
     """
 
-    VALID_ID_REGEX: RegexPattern = re.compile(r"^[a-zA-Z0-9]{3,8}$")
+    __slots__ = ("device_id", "hr_topic", "clips_topic")
+
+    device_id: str
+    hr_topic: str
+    clips_topic: str
+
+    # \A/\Z anchors, unlike ^/$, don't accept a trailing newline
+    VALID_ID_REGEX: RegexPattern = re.compile(r"\A[a-zA-Z0-9]{3,8}\Z")
+    HYPERATE_URL_REGEX: RegexPattern = re.compile(
+        r"(?:https?://)?app\.hyperate\.io/([a-zA-Z0-9\-]+)(?:\?.*)?"
+    )
+    _URL_HOST_PATH = "app.hyperate.io/"
+
+    def __init__(self, device_id: Optional[str] = None) -> None:
+        """
+        Initialize a Device and build its channel topics.
+
+        Args:
+            device_id (Optional[str]): The device ID. When omitted, the instance
+                has no device attributes.
+        """
+        if device_id is not None:
+            self.device_id = device_id
+            self.hr_topic = f"hr:{device_id}"
+            self.clips_topic = f"clips:{device_id}"
+
+    def __repr__(self) -> str:
+        device_id = getattr(self, "device_id", None)
+        return "Device()" if device_id is None else f"Device({device_id!r})"
 
     @staticmethod
     def is_valid_device_id(device_id: str) -> bool:
@@ -569,9 +740,7 @@ class Device:
             bool: True if the device ID is valid or is 'internal-testing',
                 False otherwise.
         """
-        if device_id == "internal-testing":
-            return True
-        return bool(Device.VALID_ID_REGEX.match(device_id))
+        return Device._check_device_id(device_id)
 
     @staticmethod
     def extract_device_id(input_str: str) -> Optional[str]:
@@ -583,15 +752,85 @@ class Device:
 
         Returns:
             Optional[str]: The extracted device ID if found, otherwise None.
-        """
-        # First, try to match the HypeRate URL pattern
-        hyperate_pattern = r"(?:https?://)?app\.hyperate\.io/([a-zA-Z0-9\-]+)(?:\?.*)?"
-        match = re.search(hyperate_pattern, input_str)
-        if match:
-            return match.group(1)
+
+        Raises:
+            TypeError: If input_str is not a string.
+        """
+        if not isinstance(input_str, str):
+            raise TypeError(f"expected str, got {type(input_str).__name__}")
+
+        # First, look for a HypeRate URL; the common "<url>/<id>[?query]" shape
+        # is handled with string methods and anything else goes to the regex
+        start = input_str.find(Device._URL_HOST_PATH)
+        if start != -1:
+            slug = input_str[start + len(Device._URL_HOST_PATH) :].partition("?")[0]
+            if Device._is_slug(slug):
+                return slug
+            match = Device.HYPERATE_URL_REGEX.search(input_str)
+            if match:
+                return match.group(1)
 
         # If no URL match, check if the input itself is a valid device ID
-        if re.match(r"^[a-zA-Z0-9\-]+$", input_str):
+        if Device._is_slug(input_str):
             return input_str
 
         return None
+
+    @staticmethod
+    def _is_slug(text: str) -> bool:
+        """
+        Check if text is non-empty and only has ASCII letters, digits or hyphens.
+
+        Args:
+            text (str): The text to check.
+
+        Returns:
+            bool: True if text is a non-empty run of [a-zA-Z0-9-], False otherwise.
+        """
+        return text.isascii() and text.replace("-", "a").isalnum()
+
+    @staticmethod
+    def _check_device_id(device_id: str) -> bool:
+        """
+        Apply the device ID rule shared by is_valid_device_id and validate_batch.
+
+        Args:
+            device_id (str): The device ID to check.
+
+        Returns:
+            bool: True if device_id is 'internal-testing' or matches
+                VALID_ID_REGEX, False otherwise.
+        """
+        if device_id == "internal-testing":
+            return True
+        # Same rule as VALID_ID_REGEX, checked without the regex engine
+        return 3 <= len(device_id) <= 8 and device_id.isascii() and device_id.isalnum()
+
+    @staticmethod
+    def validate_batch(device_ids: Iterable[str]) -> List[bool]:
+        """
+        Check a batch of device IDs in one pass.
+
+        Args:
+            device_ids (Iterable[str]): The device IDs to validate.
+
+        Returns:
+            List[bool]: One result per input, as returned by is_valid_device_id.
+        """
+        check = Device._check_device_id
+        return [check(device_id) for device_id in device_ids]
+
+    @staticmethod
+    def extract_batch(inputs: Iterable[str]) -> List[Optional[str]]:
+        """
+        Extract device IDs from a batch of URLs or raw device IDs in one pass.
+
+        Args:
+            inputs (Iterable[str]): The input strings containing device IDs or URLs.
+
+        Returns:
+            List[Optional[str]]: One result per input, as returned by
+                extract_device_id.
+        """
+        extract = Device.extract_device_id
+        return [extract(input_str) for input_str in inputs]
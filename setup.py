@@ -16,6 +16,9 @@ setup(
     install_requires=[
         "websockets>=10.0",
     ],
+    extras_require={
+        "orjson": ["orjson>=3.8.0"],
+    },
     python_requires=">=3.8",
     license="MIT",
     license_files=("LICENSE",),